@@ -246,7 +246,7 @@ def register_advertisement(
         return True
 
     except dbus.exceptions.DBusException as e:
-        logger.error(f"Erro ao registar advertisement: {e}")
+        logger.error("Erro ao registar advertisement: {}", e)
         return False
 
 
@@ -278,7 +278,7 @@ def unregister_advertisement(
         return True
 
     except dbus.exceptions.DBusException as e:
-        logger.error(f"Erro ao remover advertisement: {e}")
+        logger.error("Erro ao remover advertisement: {}", e)
         return False
 
 
@@ -9,8 +9,11 @@ Permite a um dispositivo:
 """
 
 import time
-from typing import List, Optional, Callable, Dict, Any
-from dataclasses import dataclass
+import struct
+import threading
+from uuid import UUID
+from typing import List, Optional, Callable, Dict, Any, Union
+from dataclasses import dataclass, field
 
 try:
     import simplepyble as simpleble
@@ -21,10 +24,133 @@ except ImportError:
 
 from common.utils.logger import get_logger
 from common.utils.ble_logger import get_ble_logger
-from common.utils.constants import IOT_NETWORK_SERVICE_UUID
+from common.utils.constants import IOT_NETWORK_SERVICE_UUID, NID_SIZE, NEIGHBOR_ENTRY_STRUCT
+from common.utils.nid import nid_cached
 
 logger = get_logger("gatt_client")
 
+# Service UUIDs de interesse, em formato binário (16 bytes) para lookup O(1)
+IOT_SERVICE_UUID_BYTES = frozenset({UUID(IOT_NETWORK_SERVICE_UUID).bytes})
+
+
+def uuid_to_bytes(value: Union[str, UUID]) -> Optional[bytes]:
+    """
+    Converte um UUID (objeto ou string) para os seus 16 bytes.
+
+    Args:
+        value: UUID como uuid.UUID ou string
+
+    Returns:
+        16 bytes do UUID, ou None se o valor não for um UUID válido
+    """
+    raw = getattr(value, 'bytes', None)
+    if raw is not None:
+        return raw
+    try:
+        return UUID(str(value)).bytes
+    except ValueError:
+        return None
+
+
+# Linha de uma tabela de vizinhos (partilhada por todos os ecrãs que a mostram)
+NEIGHBOR_ROW_TEMPLATE = "{indent}{index}. NID: {nid}\n{indent}   Hop Count: {hop_count}"
+
+
+def format_neighbor_rows(neighbors: List[Dict[str, Any]], indent: str = "   ") -> str:
+    """
+    Formata uma lista de vizinhos como texto, uma entrada por vizinho.
+
+    Args:
+        neighbors: Lista de dicts com 'nid' e 'hop_count' (formato da NeighborTable)
+        indent: Prefixo de cada linha
+
+    Returns:
+        Texto multi-linha (vazio se não houver vizinhos)
+    """
+    render = NEIGHBOR_ROW_TEMPLATE.format_map
+    return "\n".join(
+        render({'indent': indent, 'index': index, 'nid': n['nid'], 'hop_count': n['hop_count']})
+        for index, n in enumerate(neighbors, 1)
+    )
+
+
+def format_service_tree(services: List['GATTService'], indent: str = "   ") -> str:
+    """
+    Formata os serviços GATT e respetivas características como texto.
+
+    Cada característica é formatada uma única vez e o resultado é um único
+    bloco, emitido com uma só chamada ao logger.
+
+    Args:
+        services: Serviços descobertos (BLEConnection.get_services())
+        indent: Prefixo de cada linha
+
+    Returns:
+        Texto multi-linha (vazio se não houver serviços)
+    """
+    lines = []
+    for service in services:
+        lines.append(f"{indent}📦 Service: {service.uuid}")
+        for char in service.characteristics:
+            lines.append(f"{indent}   - Characteristic: {char.uuid}")
+            lines.append(f"{indent}     Capabilities: {', '.join(char.capabilities)}")
+    return "\n".join(lines)
+
+
+# Valor da DeviceInfo: NID (16) + hop count (1, signed) + device type (1)
+DEVICE_INFO_STRUCT = struct.Struct(f"!{NID_SIZE}sbB")
+
+
+def parse_device_info(data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Converte o valor da DeviceInfo Characteristic.
+
+    Formato: NID (16) + hop_count (1, signed) + device_type (1, 1 = sink, 0 = node).
+
+    Args:
+        data: Bytes lidos da característica
+
+    Returns:
+        Dict com 'nid', 'hop_count' e 'device_type', ou None se os dados
+        estiverem incompletos
+    """
+    if len(data) < DEVICE_INFO_STRUCT.size:
+        return None
+
+    nid_bytes, hop_count, device_type_byte = DEVICE_INFO_STRUCT.unpack_from(data)
+    return {
+        'nid': nid_cached(nid_bytes),
+        'hop_count': hop_count,
+        'device_type': 'sink' if device_type_byte == 1 else 'node',
+    }
+
+
+def parse_neighbor_table(data: bytes) -> List[Dict[str, Any]]:
+    """
+    Converte o valor da NeighborTable Characteristic numa lista de vizinhos.
+
+    Formato: num_neighbors (1) + N * (NID (16) + hop_count (1) + reserved (1)).
+    As entradas são descodificadas de uma só vez com struct.iter_unpack, sobre
+    uma memoryview (sem copiar a tabela entrada a entrada).
+
+    Args:
+        data: Bytes lidos/notificados da característica
+
+    Returns:
+        Lista de dicts com 'nid' e 'hop_count' (entradas truncadas são ignoradas)
+    """
+    if not data:
+        return []
+
+    entry_size = NEIGHBOR_ENTRY_STRUCT.size
+    count = min(data[0], (len(data) - 1) // entry_size)
+    entries = memoryview(data)[1:1 + count * entry_size]
+
+    return [
+        {'nid': nid_cached(nid_bytes), 'hop_count': hop_count}
+        for nid_bytes, hop_count in NEIGHBOR_ENTRY_STRUCT.iter_unpack(entries)
+    ]
+
 
 # ============================================================================
 # Data Classes
@@ -53,7 +179,7 @@ class ScannedDevice:
 
     def has_iot_service(self) -> bool:
         """Verifica se o dispositivo anuncia o serviço IoT Network."""
-        return IOT_NETWORK_SERVICE_UUID.lower() in [uuid.lower() for uuid in self.service_uuids]
+        return any(uuid_to_bytes(u) in IOT_SERVICE_UUID_BYTES for u in self.service_uuids)
 
 
 @dataclass
@@ -61,13 +187,15 @@ class GATTService:
     """Representa um GATT Service."""
     uuid: str
     characteristics: List['GATTCharacteristic']
+    _by_uuid: Dict[str, 'GATTCharacteristic'] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Índice pelo UUID normalizado (minúsculas), calculado uma única vez
+        self._by_uuid = {char.uuid.lower(): char for char in self.characteristics}
 
     def get_characteristic(self, uuid: str) -> Optional['GATTCharacteristic']:
         """Retorna uma característica pelo UUID."""
-        for char in self.characteristics:
-            if char.uuid.lower() == uuid.lower():
-                return char
-        return None
+        return self._by_uuid.get(uuid.lower())
 
 
 @dataclass
@@ -104,64 +232,179 @@ class BLEScanner:
             raise RuntimeError(f"Adaptador {adapter_index} não existe")
 
         self.adapter = adapters[adapter_index]
-        self.ble_log = get_ble_logger(self.adapter.address())
-        logger.info(f"Scanner BLE iniciado: {self.adapter.identifier()} ({self.adapter.address()})")
 
-    def scan(self, duration_ms: int = 5000, filter_iot: bool = False) -> List[ScannedDevice]:
+        # Snapshot da metadata do adaptador (cada chamada atravessa a FFI do SimpleBLE)
+        self.adapter_identifier = self.adapter.identifier()
+        try:
+            self.adapter_address = self.adapter.address()
+        except RuntimeError:
+            self.adapter_address = "unknown"
+
+        self.ble_log = get_ble_logger(self.adapter_address)
+        logger.info(f"Scanner BLE iniciado: {self.adapter_identifier} ({self.adapter_address})")
+
+        # Peripherals SimpleBLE do último scan (address -> Peripheral), para
+        # ligar a um dispositivo sem percorrer scan_get_results()
+        self._peripherals: Dict[str, Any] = {}
+
+    def _to_scanned_device(self, peripheral, iot_only: bool = False) -> Optional[ScannedDevice]:
+        """
+        Converte um SimpleBLE Peripheral num ScannedDevice.
+
+        Args:
+            peripheral: SimpleBLE Peripheral object
+            iot_only: Se True, dispositivos sem IoT Network Service são
+                descartados logo após ler os service UUIDs (sem ler o resto
+                dos dados nem criar o ScannedDevice)
+
+        Returns:
+            ScannedDevice com os dados anunciados, ou None se iot_only e o
+            dispositivo não anuncia o IoT Network Service
+        """
+        # Ler cada atributo uma única vez: cada chamada atravessa a FFI do SimpleBLE
+        address = peripheral.address()
+
+        # Extrair service UUIDs e manufacturer data (nem todos os dispositivos anunciam)
+        service_uuids = []
+        manufacturer_data = {}
+
+        services = getattr(peripheral, 'services', None)
+        try:
+            if services is not None:
+                service_uuids = [str(service.uuid()) for service in services()]
+        except Exception as e:
+            logger.debug("Erro ao obter serviços do periférico {}: {}", address, e)
+
+        if iot_only and not any(uuid_to_bytes(u) in IOT_SERVICE_UUID_BYTES for u in service_uuids):
+            return None
+
+        identifier = peripheral.identifier()
+        rssi = peripheral.rssi()
+        self._peripherals[address] = peripheral
+
+        get_manufacturer_data = getattr(peripheral, 'manufacturer_data', None)
+        try:
+            if get_manufacturer_data is not None:
+                manufacturer_data = {
+                    mfr_id: bytes(data) for mfr_id, data in get_manufacturer_data().items()
+                }
+        except Exception as e:
+            logger.debug("Erro ao obter dados do periférico {}: {}", address, e)
+
+        return ScannedDevice(
+            address=address,
+            identifier=identifier,
+            rssi=rssi,
+            name=identifier if identifier else None,
+            service_uuids=service_uuids,
+            manufacturer_data=manufacturer_data,
+        )
+
+    def _scan_until_iot_count(
+        self,
+        duration_ms: int,
+        expected_iot_count: int,
+        iot_only: bool = False,
+    ) -> Dict[str, ScannedDevice]:
+        """
+        Faz scan até encontrar `expected_iot_count` dispositivos IoT ou até timeout.
+
+        Args:
+            duration_ms: Tempo máximo de scan em milissegundos
+            expected_iot_count: Número de dispositivos IoT a encontrar
+            iot_only: Se True, só guarda os dispositivos IoT
+
+        Returns:
+            Dicionário {address: ScannedDevice} com os dados mais recentes de
+            cada dispositivo visto nos callbacks
+        """
+        condition_met = threading.Event()
+        found: Dict[str, ScannedDevice] = {}
+        iot_addresses = set()
+
+        # Os service UUIDs podem só chegar num advertisement seguinte (ou na
+        # scan response): o mesmo handler trata o primeiro advertisement
+        # (found) e as atualizações (updated) de cada peripheral
+        def on_scan_found(peripheral):
+            device = self._to_scanned_device(peripheral, iot_only)
+            if device is None:
+                return
+            found[device.address] = device
+            if device.has_iot_service():
+                iot_addresses.add(device.address)
+                if len(iot_addresses) >= expected_iot_count:
+                    condition_met.set()
+
+        self.adapter.set_callback_on_scan_found(on_scan_found)
+        self.adapter.set_callback_on_scan_updated(on_scan_found)
+        self.adapter.scan_start()
+        try:
+            if condition_met.wait(timeout=duration_ms / 1000):
+                logger.debug(f"Scan terminado cedo: {len(iot_addresses)} dispositivos IoT encontrados")
+        finally:
+            self.adapter.scan_stop()
+            self.adapter.set_callback_on_scan_found(lambda peripheral: None)
+            self.adapter.set_callback_on_scan_updated(lambda peripheral: None)
+
+        return found
+
+    def scan(
+        self,
+        duration_ms: int = 5000,
+        filter_iot: bool = False,
+        expected_iot_count: Optional[int] = None,
+    ) -> List[ScannedDevice]:
         """
         Faz scan de dispositivos BLE.
 
         Args:
             duration_ms: Duração do scan em milissegundos
             filter_iot: Se True, retorna apenas dispositivos com IoT Network Service
+            expected_iot_count: Se definido, termina o scan mais cedo assim que
+                forem encontrados este número de dispositivos IoT
+                (duration_ms passa a ser o tempo máximo)
 
         Returns:
             Lista de dispositivos encontrados
         """
         logger.info(f"A fazer scan BLE durante {duration_ms}ms...")
         self.ble_log.log_scan_start(duration_ms, filter_iot)
-
-        self.adapter.scan_for(duration_ms)
-        peripherals = self.adapter.scan_get_results()
-
-        devices = []
-        for peripheral in peripherals:
-            # Extrair service UUIDs
-            service_uuids = []
-            manufacturer_data = {}
-
-            try:
-                # Tentar obter service UUIDs (nem todos os dispositivos anunciam)
-                if hasattr(peripheral, 'services'):
-                    service_uuids = [str(service.uuid()) for service in peripheral.services()]
-
-                # Tentar obter manufacturer data
-                if hasattr(peripheral, 'manufacturer_data'):
-                    for mfr_id, data in peripheral.manufacturer_data().items():
-                        manufacturer_data[mfr_id] = bytes(data)
-            except Exception as e:
-                logger.debug(f"Erro ao obter dados do periférico {peripheral.address()}: {e}")
-
-            device = ScannedDevice(
-                address=peripheral.address(),
-                identifier=peripheral.identifier(),
-                rssi=peripheral.rssi(),
-                name=peripheral.identifier() if peripheral.identifier() else None,
-                service_uuids=service_uuids,
-                manufacturer_data=manufacturer_data,
+        self._peripherals = {}
+
+        # Com filter_iot, os dispositivos sem IoT Network Service são descartados
+        # logo na conversão (não chegam a ser criados nem guardados)
+        if expected_iot_count:
+            # Dispositivos já convertidos (e sem duplicados) pelo callback do scan
+            devices = list(
+                self._scan_until_iot_count(duration_ms, expected_iot_count, filter_iot).values()
             )
+        else:
+            self.adapter.scan_for(duration_ms)
+            devices = []
+            for peripheral in self.adapter.scan_get_results():
+                device = self._to_scanned_device(peripheral, filter_iot)
+                if device is not None:
+                    devices.append(device)
 
-            # Filtrar por IoT Network Service se pedido
-            if filter_iot and not device.has_iot_service():
-                continue
-
-            devices.append(device)
-            logger.debug(f"  Encontrado: {device}")
+        for device in devices:
+            logger.debug("  Encontrado: {}", device)
 
         logger.info(f"Scan concluído: {len(devices)} dispositivos encontrados")
         self.ble_log.log_scan_result(len(devices), devices)
         return devices
 
+    def get_peripheral(self, address: str):
+        """
+        Retorna o Peripheral SimpleBLE de um dispositivo visto no último scan.
+
+        Args:
+            address: Endereço BLE do dispositivo
+
+        Returns:
+            SimpleBLE Peripheral, ou None se não foi visto no último scan
+        """
+        return self._peripherals.get(address)
+
 
 # ============================================================================
 # BLE Connection
@@ -185,6 +428,11 @@ class BLEConnection:
         self._notification_callbacks: Dict[str, Callable] = {}
         self.ble_log = get_ble_logger()
 
+        # Serviços descobertos na ligação atual (a descoberta GATT só é feita
+        # uma vez por ligação; None = ainda não descobertos)
+        self._services: Optional[List[GATTService]] = None
+        self._services_by_uuid: Dict[str, GATTService] = {}
+
         logger.debug(f"BLEConnection criada para {self.address}")
 
     def connect(self, timeout_ms: int = 5000) -> bool:
@@ -208,6 +456,8 @@ class BLEConnection:
             connection_time_ms = (time.time() - start_time) * 1000
 
             self.is_connected = self.peripheral.is_connected()
+            self._services = None
+            self._services_by_uuid = {}
 
             if self.is_connected:
                 logger.info(f"✅ Conectado a {self.address}")
@@ -219,7 +469,7 @@ class BLEConnection:
                 return False
 
         except Exception as e:
-            logger.error(f"Erro ao conectar a {self.address}: {e}")
+            logger.error("Erro ao conectar a {}: {}", self.address, e)
             self.ble_log.log_connection_failed(self.address, str(e))
             return False
 
@@ -229,16 +479,21 @@ class BLEConnection:
             try:
                 self.peripheral.disconnect()
                 self.is_connected = False
+                self._services = None
+                self._services_by_uuid = {}
                 logger.info(f"Desconectado de {self.address}")
                 self.ble_log.log_disconnection(self.address, "normal")
             except Exception as e:
-                logger.error(f"Erro ao desconectar de {self.address}: {e}")
+                logger.error("Erro ao desconectar de {}: {}", self.address, e)
                 self.ble_log.log_disconnection(self.address, f"error: {e}")
 
     def get_services(self) -> List[GATTService]:
         """
         Retorna todos os serviços GATT do dispositivo.
 
+        A descoberta (peripheral.services()) é feita apenas na primeira chamada
+        de cada ligação; as seguintes reutilizam o resultado.
+
         Returns:
             Lista de serviços GATT
         """
@@ -246,6 +501,9 @@ class BLEConnection:
             logger.error("Não conectado - não é possível obter serviços")
             return []
 
+        if self._services is not None:
+            return self._services
+
         services = []
         for service in self.peripheral.services():
             characteristics = []
@@ -271,8 +529,41 @@ class BLEConnection:
                 characteristics=characteristics,
             ))
 
+        self._services = services
+        # Índice pelo UUID normalizado (minúsculas), resolvido na descoberta
+        self._services_by_uuid = {service.uuid.lower(): service for service in services}
         return services
 
+    def get_service(self, service_uuid: str) -> Optional[GATTService]:
+        """
+        Retorna um serviço GATT pelo UUID.
+
+        Args:
+            service_uuid: UUID do serviço
+
+        Returns:
+            GATTService ou None se o dispositivo não o tiver
+        """
+        if self._services is None:
+            self.get_services()
+        return self._services_by_uuid.get(service_uuid.lower())
+
+    def get_characteristic(self, service_uuid: str, char_uuid: str) -> Optional[GATTCharacteristic]:
+        """
+        Retorna uma característica GATT pelo UUID do serviço e da característica.
+
+        Args:
+            service_uuid: UUID do serviço
+            char_uuid: UUID da característica
+
+        Returns:
+            GATTCharacteristic ou None se não existir
+        """
+        service = self.get_service(service_uuid)
+        if service is None:
+            return None
+        return service.get_characteristic(char_uuid)
+
     def read_characteristic(self, service_uuid: str, char_uuid: str) -> Optional[bytes]:
         """
         Lê o valor de uma característica.
@@ -292,11 +583,11 @@ class BLEConnection:
             self.ble_log.log_read_request(self.address, service_uuid, char_uuid)
             data = self.peripheral.read(service_uuid, char_uuid)
             data_bytes = bytes(data)
-            logger.debug(f"Read {char_uuid}: {len(data_bytes)} bytes")
+            logger.debug("Read {}: {} bytes", char_uuid, len(data_bytes))
             self.ble_log.log_read_response(self.address, service_uuid, char_uuid, data_bytes, success=True)
             return data_bytes
         except Exception as e:
-            logger.error(f"Erro ao ler {char_uuid}: {e}")
+            logger.error("Erro ao ler {}: {}", char_uuid, e)
             self.ble_log.log_read_response(self.address, service_uuid, char_uuid, b"", success=False)
             return None
 
@@ -331,11 +622,11 @@ class BLEConnection:
             else:
                 self.peripheral.write_command(service_uuid, char_uuid, data)
 
-            logger.debug(f"Write {char_uuid}: {len(data)} bytes")
+            logger.debug("Write {}: {} bytes", char_uuid, len(data))
             self.ble_log.log_write_response(self.address, char_uuid, success=True)
             return True
         except Exception as e:
-            logger.error(f"Erro ao escrever em {char_uuid}: {e}")
+            logger.error("Erro ao escrever em {}: {}", char_uuid, e)
             self.ble_log.log_write_response(self.address, char_uuid, success=False, error=str(e))
             return False
 
@@ -374,7 +665,7 @@ class BLEConnection:
             return True
 
         except Exception as e:
-            logger.error(f"Erro ao subscrever {char_uuid}: {e}")
+            logger.error("Erro ao subscrever {}: {}", char_uuid, e)
             self.ble_log.log_subscribe(self.address, char_uuid, success=False)
             return False
 
@@ -399,7 +690,7 @@ class BLEConnection:
             logger.info(f"Cancelada subscrição: {char_uuid}")
             return True
         except Exception as e:
-            logger.error(f"Erro ao cancelar subscrição {char_uuid}: {e}")
+            logger.error("Erro ao cancelar subscrição {}: {}", char_uuid, e)
             return False
 
 
@@ -427,17 +718,27 @@ class BLEClient:
 
         logger.info("BLE Client iniciado")
 
-    def scan_iot_devices(self, duration_ms: int = 5000) -> List[ScannedDevice]:
+    def scan_iot_devices(
+        self,
+        duration_ms: int = 5000,
+        expected_count: Optional[int] = None,
+    ) -> List[ScannedDevice]:
         """
         Faz scan de dispositivos IoT Network.
 
         Args:
-            duration_ms: Duração do scan
+            duration_ms: Duração do scan (tempo máximo se expected_count for definido)
+            expected_count: Se definido, termina o scan assim que forem
+                encontrados este número de dispositivos IoT
 
         Returns:
             Lista de dispositivos IoT encontrados
         """
-        return self.scanner.scan(duration_ms=duration_ms, filter_iot=True)
+        return self.scanner.scan(
+            duration_ms=duration_ms,
+            filter_iot=True,
+            expected_iot_count=expected_count,
+        )
 
     def connect_to_device(self, device: ScannedDevice) -> Optional[BLEConnection]:
         """
@@ -456,14 +757,9 @@ class BLEClient:
                 logger.info(f"Já conectado a {device.address}")
                 return conn
 
-        # Obter peripheral do scanner (usar o mesmo adapter que fez o scan)
-        peripherals = self.scanner.adapter.scan_get_results()
-
-        peripheral = None
-        for p in peripherals:
-            if p.address() == device.address:
-                peripheral = p
-                break
+        # Obter peripheral do scanner (usar o mesmo adapter que fez o scan):
+        # lookup direto pelo endereço nos resultados do último scan
+        peripheral = self.scanner.get_peripheral(device.address)
 
         if not peripheral:
             logger.error(f"Dispositivo {device.address} não encontrado")
@@ -355,6 +355,11 @@ class Application(dbus.service.Object):
     GATT Application - implementa D-Bus ObjectManager.
 
     Agrega todos os Services, Characteristics e Descriptors da aplicação.
+
+    A resposta a GetManagedObjects é construída uma única vez e reutilizada
+    nas chamadas seguintes (o BlueZ pode voltar a pedi-la, ex: a cada
+    ligação de um cliente). Os services devem estar completos (todas as
+    characteristics e descriptors criados) antes de add_service().
     """
 
     def __init__(self, bus: dbus.SystemBus, path: str = '/'):
@@ -368,6 +373,9 @@ class Application(dbus.service.Object):
         self.path = path
         self.services: List[Service] = []
 
+        # Resposta de GetManagedObjects (None = por construir)
+        self._managed_objects: Optional[Dict[dbus.ObjectPath, Dict[str, Dict[str, Any]]]] = None
+
         dbus.service.Object.__init__(self, bus, self.path)
         logger.info(f"Application criada: {self.path}")
 
@@ -378,18 +386,11 @@ class Application(dbus.service.Object):
     def add_service(self, service: Service):
         """Adiciona um service à aplicação."""
         self.services.append(service)
+        self._managed_objects = None
         logger.info(f"Service adicionado à aplicação: {service.path}")
 
-    @dbus.service.method(DBUS_OM_IFACE, out_signature='a{oa{sa{sv}}}')
-    def GetManagedObjects(self):
-        """
-        D-Bus method: GetManagedObjects.
-
-        Retorna todos os objetos geridos pela aplicação (services, characteristics, descriptors).
-        Chamado pelo BlueZ quando a aplicação é registada.
-        """
-        logger.debug("GetManagedObjects called")
-
+    def _build_managed_objects(self) -> Dict[dbus.ObjectPath, Dict[str, Dict[str, Any]]]:
+        """Percorre services, characteristics e descriptors e monta a resposta."""
         response = {}
 
         # Adicionar todos os services
@@ -404,9 +405,24 @@ class Application(dbus.service.Object):
                 for desc in chrc.get_descriptors():
                     response[desc.get_path()] = desc.get_properties()
 
-        logger.debug(f"GetManagedObjects returning {len(response)} objects")
         return response
 
+    @dbus.service.method(DBUS_OM_IFACE, out_signature='a{oa{sa{sv}}}')
+    def GetManagedObjects(self):
+        """
+        D-Bus method: GetManagedObjects.
+
+        Retorna todos os objetos geridos pela aplicação (services, characteristics, descriptors).
+        Chamado pelo BlueZ quando a aplicação é registada.
+        """
+        logger.debug("GetManagedObjects called")
+
+        if self._managed_objects is None:
+            self._managed_objects = self._build_managed_objects()
+
+        logger.debug("GetManagedObjects returning {} objects", len(self._managed_objects))
+        return self._managed_objects
+
 
 # ============================================================================
 # Funções de Utilidade
@@ -432,8 +448,9 @@ def register_application(
     # Setup D-Bus mainloop
     dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
 
-    # Get system bus
-    bus = dbus.SystemBus()
+    # Usar a ligação D-Bus onde a application já foi exportada (em vez de
+    # obter outra ligação ao system bus)
+    bus = application.connection
 
     # Get adapter
     adapter_path = f"/org/bluez/{adapter_name}"
@@ -443,7 +460,7 @@ def register_application(
         adapter_obj = bus.get_object(BLUEZ_SERVICE_NAME, adapter_path)
         gatt_manager = dbus.Interface(adapter_obj, GATT_MANAGER_IFACE)
     except dbus.exceptions.DBusException as e:
-        logger.error(f"Erro ao aceder ao adaptador {adapter_name}: {e}")
+        logger.error("Erro ao aceder ao adaptador {}: {}", adapter_name, e)
         raise
 
     # Create mainloop
@@ -11,6 +11,7 @@ UUIDs definidos em common/utils/constants.py
 """
 
 import dbus
+import struct
 from typing import Optional, Callable, List, Dict, Any
 
 from common.ble.gatt_server import (
@@ -27,6 +28,7 @@ from common.utils.constants import (
     CHAR_AUTHENTICATION_UUID,
     GATT_CHARACTERISTIC_IFACE,
     DBUS_PROP_IFACE,
+    NEIGHBOR_ENTRY_STRUCT,
 )
 from common.utils.logger import get_logger
 from common.utils.nid import NID
@@ -34,6 +36,29 @@ from common.utils.nid import NID
 logger = get_logger("gatt_services")
 
 
+def to_dbus_bytes(data: bytes) -> dbus.ByteArray:
+    """
+    Converte bytes para um valor D-Bus 'ay'.
+
+    dbus.ByteArray é marshalled diretamente a partir do buffer, ao contrário
+    de dbus.Array(list(data), signature='y'), que cria um int Python por byte
+    (em cada notificação).
+
+    Args:
+        data: Bytes a enviar
+
+    Returns:
+        dbus.ByteArray com os mesmos bytes
+    """
+    return dbus.ByteArray(data)
+
+
+def _neighbor_sort_key(neighbor: Dict[str, Any]):
+    """Ordena vizinhos por hop count crescente (hop count desconhecido no fim)."""
+    hop_count = neighbor.get('hop_count', -1)
+    return (hop_count < 0, hop_count)
+
+
 # ============================================================================
 # NetworkPacketCharacteristic
 # ============================================================================
@@ -83,8 +108,12 @@ class NetworkPacketCharacteristic(Characteristic):
         self.packet_callback = callback
         logger.debug("Packet callback definido")
 
-    @dbus.service.method(GATT_CHARACTERISTIC_IFACE, in_signature='aya{sv}', sender_keyword='sender')
-    def WriteValue(self, value: List[int], options: Dict[str, Any], sender=None):
+    # byte_arrays=True: o valor chega como dbus.ByteArray (bytes), sem um
+    # dbus.Byte por cada byte escrito
+    @dbus.service.method(
+        GATT_CHARACTERISTIC_IFACE, in_signature='aya{sv}', sender_keyword='sender', byte_arrays=True
+    )
+    def WriteValue(self, value: bytes, options: Dict[str, Any], sender=None):
         """
         Recebe um pacote escrito por um cliente.
 
@@ -94,14 +123,14 @@ class NetworkPacketCharacteristic(Characteristic):
             sender: ID do sender D-Bus
         """
         packet_bytes = bytes(value)
-        logger.debug(f"Pacote recebido de {sender}: {len(packet_bytes)} bytes")
+        logger.debug("Pacote recebido de {}: {} bytes", sender, len(packet_bytes))
 
         # Chamar callback se definido
         if self.packet_callback:
             try:
                 self.packet_callback(packet_bytes)
             except Exception as e:
-                logger.error(f"Erro no packet callback: {e}")
+                logger.opt(exception=e).error("Erro no packet callback: {}", e)
 
     @dbus.service.method(GATT_CHARACTERISTIC_IFACE, sender_keyword='sender')
     def StartNotify(self, sender=None):
@@ -147,8 +176,7 @@ class NetworkPacketCharacteristic(Characteristic):
             return
 
         try:
-            # Converter bytes para dbus.Array
-            value = dbus.Array(list(packet_bytes), signature='y')
+            value = to_dbus_bytes(packet_bytes)
 
             # Emitir signal PropertiesChanged
             self.PropertiesChanged(
@@ -157,9 +185,9 @@ class NetworkPacketCharacteristic(Characteristic):
                 []
             )
 
-            logger.debug(f"Pacote notificado a {len(self.subscribed_clients)} clientes")
+            logger.debug("Pacote notificado a {} clientes", len(self.subscribed_clients))
         except Exception as e:
-            logger.error(f"Erro ao notificar pacote: {e}")
+            logger.error("Erro ao notificar pacote: {}", e)
 
 
 # ============================================================================
@@ -238,8 +266,8 @@ class DeviceInfoCharacteristic(Characteristic):
 
         value = self.device_nid.to_bytes() + bytes([hop_count_byte, device_type_byte])
 
-        logger.debug(f"DeviceInfo lida: NID={self.device_nid}, hops={self.hop_count}, type={device_type_byte}")
-        return dbus.Array(list(value), signature='y')
+        logger.debug("DeviceInfo lida: NID={}, hops={}, type={}", self.device_nid, self.hop_count, device_type_byte)
+        return to_dbus_bytes(value)
 
 
 # ============================================================================
@@ -284,6 +312,10 @@ class NeighborTableCharacteristic(Characteristic):
         self.notifying = False
         self.subscribed_clients = set()
 
+        # Valor D-Bus da tabela, serializado uma vez por atualização e
+        # reutilizado por todas as leituras/notificações (None = por calcular)
+        self._cached_value: Optional[dbus.ByteArray] = None
+
         logger.info("NeighborTableCharacteristic criada")
 
     def update_neighbors(self, neighbors: List[Dict[str, Any]]):
@@ -293,7 +325,9 @@ class NeighborTableCharacteristic(Characteristic):
         Args:
             neighbors: Lista de dicts com 'nid' e 'hop_count'
         """
-        self.neighbors = neighbors
+        # Ordenar uma única vez, na atualização (e não em cada consulta)
+        self.neighbors = sorted(neighbors, key=_neighbor_sort_key)
+        self._cached_value = None
         logger.debug(f"Neighbor table atualizada: {len(neighbors)} vizinhos")
 
         # Notificar clientes se houver subscrições
@@ -307,20 +341,33 @@ class NeighborTableCharacteristic(Characteristic):
         Returns:
             Bytes serializados
         """
-        # 1 byte: número de vizinhos
-        data = bytes([len(self.neighbors)])
+        # Buffer alocado de uma vez com o tamanho final (em vez de concatenar
+        # bytes a cada vizinho): 1 byte com o número de vizinhos + entradas
+        entry_size = NEIGHBOR_ENTRY_STRUCT.size
+        data = bytearray(1 + len(self.neighbors) * entry_size)
+        data[0] = len(self.neighbors)
 
-        # Para cada vizinho: NID (16) + hop_count (1) + reserved (1)
+        # Para cada vizinho: NID (16) + hop_count (1) + reserved (1, fica a 0)
+        offset = 1
         for neighbor in self.neighbors:
             nid: NID = neighbor['nid']
             hop_count: int = neighbor.get('hop_count', -1)
 
-            # Hop count como signed byte
-            hop_count_byte = hop_count if hop_count >= 0 else 256 + hop_count
+            NEIGHBOR_ENTRY_STRUCT.pack_into(data, offset, nid.to_bytes(), hop_count)
+            offset += entry_size
 
-            data += nid.to_bytes() + bytes([hop_count_byte, 0])  # 0 = reserved
+        return bytes(data)
+
+    def _get_value(self) -> dbus.ByteArray:
+        """
+        Retorna o valor D-Bus da tabela de vizinhos (em cache até à próxima atualização).
 
-        return data
+        Returns:
+            dbus.ByteArray com os bytes serializados
+        """
+        if self._cached_value is None:
+            self._cached_value = to_dbus_bytes(self._serialize_neighbors())
+        return self._cached_value
 
     @dbus.service.method(GATT_CHARACTERISTIC_IFACE, in_signature='a{sv}', out_signature='ay')
     def ReadValue(self, options: Dict[str, Any]):
@@ -330,9 +377,8 @@ class NeighborTableCharacteristic(Characteristic):
         Returns:
             Bytes serializados da tabela de vizinhos
         """
-        value = self._serialize_neighbors()
-        logger.debug(f"Neighbor table lida: {len(self.neighbors)} vizinhos")
-        return dbus.Array(list(value), signature='y')
+        logger.debug("Neighbor table lida: {} vizinhos", len(self.neighbors))
+        return self._get_value()
 
     @dbus.service.method(GATT_CHARACTERISTIC_IFACE, sender_keyword='sender')
     def StartNotify(self, sender=None):
@@ -359,17 +405,15 @@ class NeighborTableCharacteristic(Characteristic):
     def _notify_neighbors(self):
         """Notifica clientes da lista atualizada de vizinhos."""
         try:
-            value = dbus.Array(list(self._serialize_neighbors()), signature='y')
-
             self.PropertiesChanged(
                 GATT_CHARACTERISTIC_IFACE,
-                {'Value': value},
+                {'Value': self._get_value()},
                 []
             )
 
-            logger.debug(f"Neighbor table notificada a {len(self.subscribed_clients)} clientes")
+            logger.debug("Neighbor table notificada a {} clientes", len(self.subscribed_clients))
         except Exception as e:
-            logger.error(f"Erro ao notificar neighbor table: {e}")
+            logger.error("Erro ao notificar neighbor table: {}", e)
 
 
 # ============================================================================
@@ -421,8 +465,12 @@ class AuthCharacteristic(Characteristic):
         self.auth_callback = callback
         logger.debug("Auth callback definido")
 
-    @dbus.service.method(GATT_CHARACTERISTIC_IFACE, in_signature='aya{sv}', sender_keyword='sender')
-    def WriteValue(self, value: List[int], options: Dict[str, Any], sender=None):
+    # byte_arrays=True: o valor chega como dbus.ByteArray (bytes), sem um
+    # dbus.Byte por cada byte escrito
+    @dbus.service.method(
+        GATT_CHARACTERISTIC_IFACE, in_signature='aya{sv}', sender_keyword='sender', byte_arrays=True
+    )
+    def WriteValue(self, value: bytes, options: Dict[str, Any], sender=None):
         """
         Recebe mensagem de autenticação de um cliente.
 
@@ -432,7 +480,7 @@ class AuthCharacteristic(Characteristic):
             sender: ID do sender
         """
         auth_data = bytes(value)
-        logger.debug(f"Auth data recebida de {sender}: {len(auth_data)} bytes")
+        logger.debug("Auth data recebida de {}: {} bytes", sender, len(auth_data))
 
         # Processar autenticação
         if self.auth_callback:
@@ -441,7 +489,7 @@ class AuthCharacteristic(Characteristic):
                 # Enviar resposta via Indicate
                 self._indicate_response(response)
             except Exception as e:
-                logger.error(f"Erro no auth callback: {e}")
+                logger.opt(exception=e).error("Erro no auth callback: {}", e)
 
     @dbus.service.method(GATT_CHARACTERISTIC_IFACE, sender_keyword='sender')
     def StartNotify(self, sender=None):
@@ -477,7 +525,7 @@ class AuthCharacteristic(Characteristic):
             return
 
         try:
-            value = dbus.Array(list(response_bytes), signature='y')
+            value = to_dbus_bytes(response_bytes)
 
             self.PropertiesChanged(
                 GATT_CHARACTERISTIC_IFACE,
@@ -487,7 +535,7 @@ class AuthCharacteristic(Characteristic):
 
             logger.debug("Auth response indicada")
         except Exception as e:
-            logger.error(f"Erro ao indicar auth response: {e}")
+            logger.error("Erro ao indicar auth response: {}", e)
 
 
 # ============================================================================
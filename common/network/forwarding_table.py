@@ -6,7 +6,7 @@ Cada dispositivo aprende por qual link deve enviar mensagens para cada NID:
 - Quando precisa enviar para X → consulta tabela e envia por Y
 """
 
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Set
 from datetime import datetime, timedelta
 from threading import Lock
 
@@ -82,9 +82,32 @@ class ForwardingTable:
             timeout: Tempo em segundos para expiração de entradas (None = sem timeout)
         """
         self._table: Dict[NID, ForwardingEntry] = {}
+        # Índice inverso link → NIDs aprendidos por esse link, para remover as
+        # rotas de um link sem percorrer a tabela toda
+        self._by_link: Dict[Any, Set[NID]] = {}
         self._lock = Lock()
         self.timeout = timeout  # segundos
 
+    def _unindex(self, nid: NID, link: Any):
+        """Retira um NID do índice por link (lock já adquirido)."""
+        nids = self._by_link.get(link)
+        if nids is not None:
+            nids.discard(nid)
+            if not nids:
+                del self._by_link[link]
+
+    def _delete_entry(self, nid: NID):
+        """
+        Remove uma entrada da tabela e do índice por link.
+
+        Deve ser chamado com o lock adquirido.
+
+        Args:
+            nid: NID a remover (tem de existir na tabela)
+        """
+        entry = self._table.pop(nid)
+        self._unindex(nid, entry.link)
+
     def learn(self, nid: NID, link: Any):
         """
         Aprende uma rota (associa NID a um link).
@@ -98,12 +121,15 @@ class ForwardingTable:
                 # Atualizar entrada existente
                 entry = self._table[nid]
                 if entry.link != link:
-                    logger.debug(f"Updating route for {nid}: {entry.link} → {link}")
+                    logger.debug("Updating route for {}: {} → {}", nid, entry.link, link)
+                    self._unindex(nid, entry.link)
+                    self._by_link.setdefault(link, set()).add(nid)
                 entry.update(link)
             else:
                 # Nova entrada
-                logger.debug(f"Learning new route: {nid} → {link}")
+                logger.debug("Learning new route: {} → {}", nid, link)
                 self._table[nid] = ForwardingEntry(nid, link)
+                self._by_link.setdefault(link, set()).add(nid)
 
     def lookup(self, nid: NID) -> Optional[Any]:
         """
@@ -123,8 +149,8 @@ class ForwardingTable:
 
             # Verificar se a entrada expirou
             if self.timeout and entry.age().total_seconds() > self.timeout:
-                logger.debug(f"Route to {nid} expired (age: {entry.age()})")
-                del self._table[nid]
+                logger.debug("Route to {} expired (age: {})", nid, entry.age())
+                self._delete_entry(nid)
                 return None
 
             # Incrementar contador
@@ -143,8 +169,8 @@ class ForwardingTable:
         """
         with self._lock:
             if nid in self._table:
-                logger.debug(f"Removing route for {nid}")
-                del self._table[nid]
+                logger.debug("Removing route for {}", nid)
+                self._delete_entry(nid)
                 return True
             return False
 
@@ -161,13 +187,14 @@ class ForwardingTable:
             Número de entradas removidas
         """
         with self._lock:
-            to_remove = [nid for nid, entry in self._table.items() if entry.link == link]
+            # O(rotas deste link), em vez de percorrer a tabela toda
+            to_remove = self._by_link.pop(link, ())
 
             for nid in to_remove:
-                logger.debug(f"Removing route for {nid} (link {link} down)")
                 del self._table[nid]
 
             if to_remove:
+                logger.debug("Removing routes for link {} (down): {}", link, ', '.join(map(str, to_remove)))
                 logger.info(f"Removed {len(to_remove)} routes for link {link}")
 
             return len(to_remove)
@@ -177,6 +204,7 @@ class ForwardingTable:
         with self._lock:
             count = len(self._table)
             self._table.clear()
+            self._by_link.clear()
             logger.info(f"Cleared forwarding table ({count} entries)")
 
     def cleanup_expired(self) -> int:
@@ -197,10 +225,10 @@ class ForwardingTable:
             ]
 
             for nid in expired:
-                logger.debug(f"Removing expired route for {nid}")
-                del self._table[nid]
+                self._delete_entry(nid)
 
             if expired:
+                logger.debug("Removing expired routes: {}", ', '.join(map(str, expired)))
                 logger.info(f"Cleaned up {len(expired)} expired entries")
 
             return len(expired)
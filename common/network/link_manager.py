@@ -114,7 +114,7 @@ class Link:
         success = self.connection.write_characteristic(service_uuid, char_uuid, data)
         if success:
             self.last_activity = datetime.now()
-            logger.debug(f"Dados enviados via {self}: {len(data)} bytes")
+            logger.debug("Dados enviados via {}: {} bytes", self, len(data))
         return success
 
     def disconnect(self):
@@ -185,10 +185,13 @@ class LinkManager:
     def clear_uplink(self):
         """Remove o uplink."""
         with self._lock:
-            if self.uplink:
-                self.uplink.disconnect()
-                self.uplink = None
-                logger.info("Uplink removido")
+            link = self.uplink
+            self.uplink = None
+
+        # Desconectar fora do lock: o callback de desconexão volta a adquiri-lo
+        if link:
+            link.disconnect()
+            logger.info("Uplink removido")
 
     def get_uplink(self) -> Optional[Link]:
         """Retorna o uplink atual."""
@@ -251,14 +254,16 @@ class LinkManager:
             address: Endereço BLE do child
         """
         with self._lock:
-            if address in self.downlinks:
-                link = self.downlinks[address]
-                link.disconnect()
-                del self.downlinks[address]
-                logger.info(f"Downlink removido: {address}")
+            link = self.downlinks.pop(address, None)
+
+        # Desconectar fora do lock: o callback de desconexão chama
+        # remove_downlink() outra vez (que já não encontra o link)
+        if link:
+            link.disconnect()
+            logger.info(f"Downlink removido: {address}")
 
-                # Notificar callbacks
-                self._notify_lost_link(link)
+            # Notificar callbacks
+            self._notify_lost_link(link)
 
     def get_downlink(self, address: str) -> Optional[Link]:
         """
@@ -357,15 +362,18 @@ class LinkManager:
         Returns:
             Número de downlinks que receberam com sucesso
         """
-        count = 0
-        for address, link in self.downlinks.items():
-            if exclude and address == exclude:
-                continue
+        with self._lock:
+            targets = [
+                link for address, link in self.downlinks.items()
+                if not (exclude and address == exclude)
+            ]
 
+        count = 0
+        for link in targets:
             if link.send(data, service_uuid, char_uuid):
                 count += 1
 
-        logger.debug(f"Broadcast para {count}/{len(self.downlinks)} downlinks")
+        logger.debug("Broadcast para {}/{} downlinks", count, len(targets))
         return count
 
     # ========================================================================
@@ -390,21 +398,29 @@ class LinkManager:
         """
         self._lost_link_callbacks.append(callback)
 
-    def _notify_new_downlink(self, link: Link):
-        """Notifica callbacks de novo downlink."""
-        for callback in self._new_downlink_callbacks:
+    @staticmethod
+    def _run_callbacks(callbacks: List[Callable[[Link], None]], link: Link, event: str):
+        """
+        Chama cada callback com o link (um callback que falhe não impede os restantes).
+
+        Args:
+            callbacks: Callbacks registados
+            link: Link a passar aos callbacks
+            event: Nome do evento (para o log de erro)
+        """
+        for callback in callbacks:
             try:
                 callback(link)
             except Exception as e:
-                logger.error(f"Erro em callback new_downlink: {e}")
+                logger.opt(exception=e).error("Erro em callback {}: {}", event, e)
+
+    def _notify_new_downlink(self, link: Link):
+        """Notifica callbacks de novo downlink."""
+        self._run_callbacks(self._new_downlink_callbacks, link, "new_downlink")
 
     def _notify_lost_link(self, link: Link):
         """Notifica callbacks de link perdido."""
-        for callback in self._lost_link_callbacks:
-            try:
-                callback(link)
-            except Exception as e:
-                logger.error(f"Erro em callback lost_link: {e}")
+        self._run_callbacks(self._lost_link_callbacks, link, "lost_link")
 
     # ========================================================================
     # Status & Info
@@ -425,16 +441,29 @@ class LinkManager:
         }
 
     def disconnect_all(self):
-        """Desconecta todos os links."""
+        """
+        Desconecta todos os links.
+
+        Pode ser chamado várias vezes (ex: no handler de Ctrl+C e depois no
+        atexit): se não houver links, retorna sem percorrer nada.
+        """
+        with self._lock:
+            addresses = list(self.downlinks.keys())
+            has_uplink = self.uplink is not None
+
+        if not has_uplink and not addresses:
+            return
+
         logger.info("A desconectar todos os links...")
 
         # Desconectar uplink
-        self.clear_uplink()
+        if has_uplink:
+            self.clear_uplink()
 
-        # Desconectar downlinks
-        with self._lock:
-            for address in list(self.downlinks.keys()):
-                self.remove_downlink(address)
+        # Desconectar downlinks (remove_downlink adquire o lock, por isso é
+        # chamado fora dele - o Lock não é reentrante)
+        for address in addresses:
+            self.remove_downlink(address)
 
         logger.info("Todos os links desconectados")
 
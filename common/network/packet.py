@@ -12,7 +12,7 @@ import struct
 from typing import Optional
 from dataclasses import dataclass
 
-from common.utils.nid import NID
+from common.utils.nid import NID, nid_cached
 from common.utils.constants import (
     MessageType,
     NID_SIZE,
@@ -24,6 +24,14 @@ from common.utils.constants import (
     DEFAULT_TTL,
 )
 
+# Header: source(16) + dest(16) + type(1) + ttl(1) + seq(4) + mac(32)
+# (formato compilado uma única vez e partilhado por todas as serializações)
+HEADER_STRUCT = struct.Struct(f"!{NID_SIZE}s{NID_SIZE}sBBI{MAC_SIZE}s")
+
+# Posição e formato do sequence number no header (para o atualizar in-place)
+SEQUENCE_OFFSET = (NID_SIZE * 2) + TYPE_SIZE + TTL_SIZE
+SEQUENCE_STRUCT = struct.Struct("!I")
+
 
 @dataclass
 class Packet:
@@ -107,9 +115,7 @@ class Packet:
         Returns:
             Representação binária do pacote
         """
-        # Header format: source(16) + dest(16) + type(1) + ttl(1) + seq(4) + mac(32)
-        header = struct.pack(
-            f"!{NID_SIZE}s{NID_SIZE}sBBI{MAC_SIZE}s",
+        header = HEADER_STRUCT.pack(
             self.source.to_bytes(),
             self.destination.to_bytes(),
             self.msg_type,
@@ -140,9 +146,7 @@ class Packet:
                 f"Esperado mínimo {PACKET_HEADER_SIZE}, recebeu {len(data)}"
             )
 
-        # Unpack header
-        header_format = f"!{NID_SIZE}s{NID_SIZE}sBBI{MAC_SIZE}s"
-        header_data = data[:PACKET_HEADER_SIZE]
+        # Unpack header (diretamente sobre os dados, sem copiar o header)
         payload_data = data[PACKET_HEADER_SIZE:]
 
         (
@@ -152,11 +156,11 @@ class Packet:
             ttl,
             sequence,
             mac,
-        ) = struct.unpack(header_format, header_data)
+        ) = HEADER_STRUCT.unpack_from(data)
 
-        # Criar NIDs
-        source = NID.from_bytes(source_bytes)
-        destination = NID.from_bytes(dest_bytes)
+        # Criar NIDs (partilhados: os mesmos NIDs repetem-se em muitos pacotes)
+        source = nid_cached(source_bytes)
+        destination = nid_cached(dest_bytes)
 
         return cls(
             source=source,
@@ -22,9 +22,9 @@ import time
 from typing import Optional
 from dataclasses import dataclass
 
-from common.utils.nid import NID
-from common.utils.constants import MessageType, HEARTBEAT_INTERVAL
-from common.network.packet import Packet
+from common.utils.nid import NID, nid_cached
+from common.utils.constants import MessageType, HEARTBEAT_INTERVAL, PACKET_HEADER_SIZE
+from common.network.packet import Packet, SEQUENCE_OFFSET, SEQUENCE_STRUCT
 from common.utils.logger import get_logger
 
 logger = get_logger("heartbeat")
@@ -35,6 +35,17 @@ HEARTBEAT_TIMESTAMP_SIZE = 8
 HEARTBEAT_SIGNATURE_SIZE = 64
 HEARTBEAT_PAYLOAD_SIZE = HEARTBEAT_NID_SIZE + HEARTBEAT_TIMESTAMP_SIZE + HEARTBEAT_SIGNATURE_SIZE
 
+# Payload: sink_nid(16) + timestamp(8 double) + signature(64)
+# (formato compilado uma única vez, como o HEADER_STRUCT dos pacotes)
+HEARTBEAT_PAYLOAD_STRUCT = struct.Struct(f"!{HEARTBEAT_NID_SIZE}sd{HEARTBEAT_SIGNATURE_SIZE}s")
+
+# Assinatura placeholder (zeros) enquanto não há assinatura ECDSA
+PLACEHOLDER_SIGNATURE = b'\x00' * HEARTBEAT_SIGNATURE_SIZE
+
+# Posição e formato do timestamp num pacote de heartbeat serializado
+HEARTBEAT_TIMESTAMP_OFFSET = PACKET_HEADER_SIZE + HEARTBEAT_NID_SIZE
+HEARTBEAT_TIMESTAMP_STRUCT = struct.Struct("!d")
+
 
 @dataclass
 class HeartbeatPayload:
@@ -85,7 +96,7 @@ class HeartbeatPayload:
         if signature is None:
             # Placeholder: zeros
             # TODO: Implementar assinatura digital ECDSA
-            signature = b'\x00' * HEARTBEAT_SIGNATURE_SIZE
+            signature = PLACEHOLDER_SIGNATURE
 
         return cls(
             sink_nid=sink_nid,
@@ -100,9 +111,7 @@ class HeartbeatPayload:
         Returns:
             Representação binária (88 bytes)
         """
-        # Format: sink_nid(16) + timestamp(8 double) + signature(64)
-        return struct.pack(
-            f"!{HEARTBEAT_NID_SIZE}sd{HEARTBEAT_SIGNATURE_SIZE}s",
+        return HEARTBEAT_PAYLOAD_STRUCT.pack(
             self.sink_nid.to_bytes(),
             self.timestamp,
             self.signature,
@@ -129,14 +138,13 @@ class HeartbeatPayload:
             )
 
         # Unpack
-        format_str = f"!{HEARTBEAT_NID_SIZE}sd{HEARTBEAT_SIGNATURE_SIZE}s"
         (
             sink_nid_bytes,
             timestamp,
             signature,
-        ) = struct.unpack(format_str, data)
+        ) = HEARTBEAT_PAYLOAD_STRUCT.unpack(data)
 
-        sink_nid = NID.from_bytes(sink_nid_bytes)
+        sink_nid = nid_cached(sink_nid_bytes)
 
         return cls(
             sink_nid=sink_nid,
@@ -174,7 +182,7 @@ class HeartbeatPayload:
             f"HeartbeatPayload(\n"
             f"  sink={self.sink_nid},\n"
             f"  timestamp={self.timestamp:.2f} (age: {self.age():.2f}s),\n"
-            f"  signature={'<placeholder>' if self.signature == b'\\x00' * 64 else '<signed>'}\n"
+            f"  signature={'<placeholder>' if self.signature == PLACEHOLDER_SIGNATURE else '<signed>'}\n"
             f")"
         )
 
@@ -212,11 +220,54 @@ def create_heartbeat_packet(
         ttl=1,  # Heartbeats não fazem forwarding
     )
 
-    logger.debug(f"Heartbeat packet criado: seq={sequence}, size={packet.size()} bytes")
+    logger.debug("Heartbeat packet criado: seq={}, size={} bytes", sequence, packet.size())
 
     return packet
 
 
+class HeartbeatTemplate:
+    """
+    Pacote de heartbeat pré-serializado.
+
+    Entre heartbeats do mesmo Sink só mudam o sequence number e o timestamp:
+    o pacote é serializado uma vez e cada heartbeat apenas reescreve esses
+    dois campos no buffer (em vez de criar payload + pacote e serializar tudo).
+
+    Note:
+        Quando os heartbeats forem assinados/autenticados, a assinatura e o
+        MAC têm de ser recalculados sobre o buffer depois de build().
+    """
+
+    def __init__(self, sink_nid: NID, broadcast_nid: Optional[NID] = None):
+        """
+        Inicializa o template.
+
+        Args:
+            sink_nid: NID do Sink que envia o heartbeat
+            broadcast_nid: NID de broadcast (None = usa sink_nid)
+        """
+        packet = create_heartbeat_packet(sink_nid, broadcast_nid, sequence=0)
+        self._buffer = bytearray(packet.to_bytes())
+
+    def build(self, sequence: int, timestamp: Optional[float] = None) -> bytes:
+        """
+        Gera os bytes de um heartbeat.
+
+        Args:
+            sequence: Número de sequência
+            timestamp: Timestamp (usa time.time() se None)
+
+        Returns:
+            Pacote de heartbeat serializado
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        SEQUENCE_STRUCT.pack_into(self._buffer, SEQUENCE_OFFSET, sequence)
+        HEARTBEAT_TIMESTAMP_STRUCT.pack_into(self._buffer, HEARTBEAT_TIMESTAMP_OFFSET, timestamp)
+        return bytes(self._buffer)
+
+
 def parse_heartbeat_packet(packet: Packet) -> Optional[HeartbeatPayload]:
     """
     Extrai o payload de heartbeat de um pacote.
@@ -246,7 +297,7 @@ def parse_heartbeat_packet(packet: Packet) -> Optional[HeartbeatPayload]:
         return heartbeat
 
     except Exception as e:
-        logger.error(f"Erro ao parsear heartbeat: {e}")
+        logger.error("Erro ao parsear heartbeat: {}", e)
         return None
 
 
@@ -286,7 +337,7 @@ class HeartbeatMonitor:
         if len(self.heartbeat_history) > 10:
             self.heartbeat_history.pop(0)
 
-        logger.debug(f"Heartbeat recebido: {heartbeat.sink_nid} (age: {heartbeat.age():.2f}s)")
+        logger.debug("Heartbeat recebido: {} (age: {:.2f}s)", heartbeat.sink_nid, heartbeat.age())
 
     def check_timeout(self) -> bool:
         """
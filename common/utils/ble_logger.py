@@ -13,6 +13,10 @@ from loguru import logger
 
 from common.utils.config import config
 
+# Tabela de tradução byte -> caractere ASCII imprimível ('.' nos restantes),
+# para a coluna ASCII do hex dump ser feita com um único bytes.translate()
+_ASCII_TABLE = bytes(b if 32 <= b < 127 else ord('.') for b in range(256))
+
 
 class BLEOperationLogger:
     """
@@ -65,7 +69,7 @@ class BLEOperationLogger:
             )
 
         except (PermissionError, OSError) as e:
-            logger.warning(f"Não foi possível criar ficheiro de log BLE: {e}")
+            logger.warning("Não foi possível criar ficheiro de log BLE: {}", e)
 
     def _get_operation_id(self) -> str:
         """Retorna um ID único para a operação."""
@@ -86,8 +90,9 @@ class BLEOperationLogger:
         if not data:
             return "<empty>"
 
-        hex_str = data[:max_length].hex()
-        ascii_str = ''.join(chr(b) if 32 <= b < 127 else '.' for b in data[:max_length])
+        shown = bytes(data[:max_length])
+        hex_str = shown.hex()
+        ascii_str = shown.translate(_ASCII_TABLE).decode('ascii')
 
         truncated = " [TRUNCATED]" if len(data) > max_length else ""
 
@@ -122,14 +127,22 @@ class BLEOperationLogger:
             f"Devices_Found: {devices_found}"
         )
 
-        for i, device in enumerate(devices, 1):
-            logger.debug(
+        if not devices:
+            return
+
+        # Um único registo (multi-linha) para todos os dispositivos, em vez de
+        # um registo por dispositivo; o texto só é montado se o DEBUG for aceite
+        logger.opt(lazy=True).debug(
+            "{}",
+            lambda: "\n".join(
                 f"[{op_id}]   Device_{i}: "
                 f"Name: {device.name or 'Unknown'} | "
                 f"Address: {device.address} | "
                 f"RSSI: {device.rssi} dBm | "
                 f"Services: {len(device.service_uuids)}"
-            )
+                for i, device in enumerate(devices, 1)
+            ),
+        )
 
     def log_connection_attempt(self, remote_address: str):
         """
@@ -4,6 +4,8 @@ Constantes globais do projeto IoT Bluetooth Network.
 Define UUIDs, message types, configurações default, etc.
 """
 
+import struct
+
 # ============================================================================
 # GATT Service UUIDs
 # ============================================================================
@@ -47,18 +49,23 @@ class MessageType:
     AUTH_RESPONSE = 0x05 # Resposta de autenticação
     ROUTE_LEARN = 0x06   # Mensagem para aprendizagem de rota
 
+    # Tabela tipo → nome, construída uma única vez (e não a cada to_string())
+    _NAMES = {
+        DATA: "DATA",
+        HEARTBEAT: "HEARTBEAT",
+        CONTROL: "CONTROL",
+        AUTH_REQUEST: "AUTH_REQUEST",
+        AUTH_RESPONSE: "AUTH_RESPONSE",
+        ROUTE_LEARN: "ROUTE_LEARN",
+    }
+
     @staticmethod
     def to_string(msg_type: int) -> str:
         """Converte tipo de mensagem para string."""
-        mapping = {
-            0x01: "DATA",
-            0x02: "HEARTBEAT",
-            0x03: "CONTROL",
-            0x04: "AUTH_REQUEST",
-            0x05: "AUTH_RESPONSE",
-            0x06: "ROUTE_LEARN",
-        }
-        return mapping.get(msg_type, f"UNKNOWN(0x{msg_type:02x})")
+        name = MessageType._NAMES.get(msg_type)
+        if name is None:
+            return f"UNKNOWN(0x{msg_type:02x})"
+        return name
 
 # ============================================================================
 # Packet Format Constants
@@ -74,6 +81,13 @@ MAC_SIZE = 32           # HMAC-SHA256
 # Header total = Source NID + Dest NID + Type + TTL + Seq + MAC
 PACKET_HEADER_SIZE = (NID_SIZE * 2) + TYPE_SIZE + TTL_SIZE + SEQUENCE_SIZE + MAC_SIZE
 
+# Entrada da NeighborTable Characteristic (formato partilhado pelo GATT
+# Server e pelo cliente): NID (16) + hop count (1, signed) + reserved (1)
+NEIGHBOR_ENTRY_STRUCT = struct.Struct(f"!{NID_SIZE}sbx")
+
+# NIDs reutilizados por nid_cached() (instâncias partilhadas, imutáveis)
+NID_CACHE_SIZE = 4096
+
 # Valores default
 DEFAULT_TTL = 10
 MAX_TTL = 255
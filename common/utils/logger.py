@@ -6,9 +6,13 @@ Fornece logging formatado para ficheiros e consola.
 
 import sys
 from pathlib import Path
+from typing import Optional
 from loguru import logger
 from common.utils.config import config
 
+# Configuração aplicada pela última chamada a setup_logger()
+_current_setup: Optional[tuple] = None
+
 
 def setup_logger(
     module_name: str = "iot-network",
@@ -26,6 +30,13 @@ def setup_logger(
     Returns:
         Logger configurado
     """
+    global _current_setup
+
+    # Mesma configuração já ativa: não remover/voltar a abrir os sinks
+    setup_key = (module_name, log_to_file, log_to_console)
+    if setup_key == _current_setup:
+        return logger
+
     # Remover handlers default
     logger.remove()
 
@@ -77,6 +88,7 @@ def setup_logger(
             print(f"⚠️  Aviso: Não foi possível criar ficheiro de log: {e}", file=sys.stderr)
             print(f"   Logs apenas na consola.", file=sys.stderr)
 
+    _current_setup = setup_key
     return logger
 
 
@@ -5,8 +5,11 @@ NIDs são UUIDs de 128 bits usados para identificar dispositivos na rede.
 """
 
 import uuid
+from functools import lru_cache
 from typing import Union
 
+from common.utils.constants import NID_CACHE_SIZE
+
 
 class NID:
     """
@@ -15,6 +18,8 @@ class NID:
     Wrapper sobre UUID para facilitar conversões e validações.
     """
 
+    __slots__ = ('_uuid', '_short', '_string')
+
     def __init__(self, value: Union[str, bytes, uuid.UUID]):
         """
         Inicializa um NID.
@@ -36,6 +41,10 @@ class NID:
         else:
             raise ValueError(f"Tipo inválido para NID: {type(value)}")
 
+        # Formatos de texto (curto e completo), calculados apenas quando forem precisos
+        self._short = None
+        self._string = None
+
     @classmethod
     def generate(cls) -> 'NID':
         """
@@ -97,12 +106,18 @@ class NID:
         Returns:
             String UUID (formato: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx)
         """
-        return str(self._uuid)
+        # O NID é imutável: a formatação do UUID é feita uma única vez
+        if self._string is None:
+            self._string = str(self._uuid)
+        return self._string
 
     def __str__(self) -> str:
         """String representation (formato curto para display)."""
         # Mostrar apenas os primeiros 8 caracteres para brevidade
-        return self.to_hex()[:8] + "..."
+        # (o NID é imutável, por isso a string é calculada uma única vez)
+        if self._short is None:
+            self._short = self.to_hex()[:8] + "..."
+        return self._short
 
     def __repr__(self) -> str:
         """Representação completa."""
@@ -123,6 +138,27 @@ class NID:
         return self.to_bytes()
 
 
+@lru_cache(maxsize=NID_CACHE_SIZE)
+def nid_cached(raw: bytes) -> NID:
+    """
+    Cria (ou reutiliza) o NID correspondente a 16 bytes.
+
+    Os mesmos NIDs aparecem repetidamente (cabeçalhos de pacotes, heartbeats,
+    tabelas de vizinhos); como o NID é imutável, a mesma instância pode ser
+    partilhada em vez de voltar a fazer o parse do UUID.
+
+    Args:
+        raw: 16 bytes do NID
+
+    Returns:
+        NID correspondente
+
+    Raises:
+        ValueError: Se não tiver 16 bytes
+    """
+    return NID(raw)
+
+
 def is_valid_nid(value: Union[str, bytes]) -> bool:
     """
     Verifica se um valor é um NID válido.
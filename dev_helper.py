@@ -8,7 +8,41 @@ Script de utilidades para ajudar no desenvolvimento do projeto.
 import os
 import sys
 from pathlib import Path
-from typing import List, Tuple
+from typing import AbstractSet, Iterator, List, Tuple
+
+# Diretórios ignorados ao percorrer o projeto (frozenset: lookup O(1) por entrada)
+SKIP_DIRS = frozenset({'__pycache__', 'venv', '.git'})
+SKIP_DIRS_LOC = SKIP_DIRS | {'docs'}
+
+
+def iter_python_files(root: str = '.', skip_dirs: AbstractSet[str] = frozenset()) -> Iterator[Path]:
+    """
+    Percorre a árvore de diretórios com os.scandir e devolve os ficheiros .py.
+
+    O tipo de cada entrada (diretório/ficheiro) vem do próprio readdir
+    (DirEntry.is_dir/is_file), sem um stat() extra por entrada.
+
+    Args:
+        root: Diretório de partida
+        skip_dirs: Nomes de diretórios a ignorar
+
+    Yields:
+        Path de cada ficheiro Python
+    """
+    pending = [root]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in skip_dirs:
+                        pending.append(entry.path)
+                elif entry.name.endswith('.py') and entry.is_file():
+                    yield Path(entry.path)
 
 
 def count_lines_of_code() -> Tuple[int, int]:
@@ -21,25 +55,18 @@ def count_lines_of_code() -> Tuple[int, int]:
     total = 0
     code = 0
 
-    for root, dirs, files in os.walk('.'):
-        # Ignorar diretórios
-        dirs[:] = [d for d in dirs if d not in ['__pycache__', 'venv', '.git', 'docs']]
-
-        for file in files:
-            if file.endswith('.py'):
-                filepath = Path(root) / file
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                        total += len(lines)
-
-                        for line in lines:
-                            stripped = line.strip()
-                            # Contar se não for vazia nem comentário
-                            if stripped and not stripped.startswith('#'):
-                                code += 1
-                except Exception as e:
-                    print(f"Erro ao ler {filepath}: {e}")
+    for filepath in iter_python_files(skip_dirs=SKIP_DIRS_LOC):
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                # Iterar o ficheiro linha a linha (sem carregar a lista completa)
+                for line in f:
+                    total += 1
+                    stripped = line.strip()
+                    # Contar se não for vazia nem comentário
+                    if stripped and not stripped.startswith('#'):
+                        code += 1
+        except Exception as e:
+            print(f"Erro ao ler {filepath}: {e}")
 
     return total, code
 
@@ -51,18 +78,7 @@ def list_python_files() -> List[Path]:
     Returns:
         Lista de Paths
     """
-    files = []
-
-    for root, dirs, filenames in os.walk('.'):
-        # Ignorar diretórios
-        dirs[:] = [d for d in dirs if d not in ['__pycache__', 'venv', '.git']]
-
-        for filename in filenames:
-            if filename.endswith('.py'):
-                filepath = Path(root) / filename
-                files.append(filepath)
-
-    return sorted(files)
+    return sorted(iter_python_files(skip_dirs=SKIP_DIRS))
 
 
 def check_structure():
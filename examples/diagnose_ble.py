@@ -7,26 +7,97 @@ Mostra todos os dispositivos BLE encontrados, com ou sem IoT Network Service.
 
 Uso:
     python3 examples/diagnose_ble.py
+    python3 examples/diagnose_ble.py --expected-iot 2   # termina ao encontrar 2 nós IoT
 """
 
 import sys
-import time
+import argparse
+from functools import partial
 from pathlib import Path
 
 # Adicionar o diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from common.ble.gatt_client import BLEScanner, SIMPLEBLE_AVAILABLE
+from common.ble.gatt_client import (
+    BLEScanner,
+    SIMPLEBLE_AVAILABLE,
+    IOT_SERVICE_UUID_BYTES,
+    uuid_to_bytes,
+)
 from common.utils.constants import IOT_NETWORK_SERVICE_UUID
 from common.utils.logger import setup_logger
 
-# Setup logger
-logger = setup_logger("diagnose_ble")
+# Service UUIDs alvo em formato binário (16 bytes) - lookup O(1), sem strings
+TARGET_SET = IOT_SERVICE_UUID_BYTES
 
 
-def main():
+def is_iot_service_uuid(value) -> bool:
+    """
+    Verifica se um UUID anunciado corresponde a um dos serviços alvo.
+
+    Args:
+        value: UUID (uuid.UUID ou string)
+
+    Returns:
+        True se for um dos Service UUIDs em TARGET_SET
+    """
+    return uuid_to_bytes(value) in TARGET_SET
+
+
+SEPARATOR = "=" * 70
+
+
+def format_device_block(index: int, device, is_iot: bool) -> str:
+    """
+    Formata a informação de um dispositivo num único bloco multi-linha.
+
+    Args:
+        index: Posição do dispositivo na lista (1-based)
+        device: ScannedDevice a mostrar
+        is_iot: True se o dispositivo anuncia o IoT Network Service
+
+    Returns:
+        Bloco de texto (termina com linha em branco)
+    """
+    parts = [
+        f"  [{index}] {device.name or 'Unknown'}",
+        f"      Endereço BLE: {device.address}",
+        f"      RSSI: {device.rssi} dBm",
+    ]
+
+    if device.service_uuids:
+        if is_iot:
+            parts.append("      Service UUIDs anunciados:")
+        else:
+            parts.append(f"      Service UUIDs anunciados: {len(device.service_uuids)}")
+        for service_uuid in device.service_uuids:
+            marker = "  ← IoT Network Service" if is_iot_service_uuid(service_uuid) else ""
+            parts.append(f"        - {service_uuid}{marker}")
+    elif not is_iot:
+        parts.append("      Service UUIDs: <nenhum UUID anunciado>")
+
+    if device.manufacturer_data:
+        parts.append(f"      Manufacturer Data: {len(device.manufacturer_data)} entries")
+
+    parts.append("")
+    return "\n".join(parts)
+
+
+def main(argv=None):
     """Main function."""
 
+    parser = argparse.ArgumentParser(description="BLE Diagnostic Tool")
+    parser.add_argument(
+        "--expected-iot",
+        type=int,
+        default=None,
+        help="Termina o scan assim que encontrar N dispositivos IoT (default: scan completo)",
+    )
+    args = parser.parse_args(argv)
+
+    # Setup logger (aqui e não no import, para o módulo não ter side effects)
+    logger = setup_logger("diagnose_ble")
+
     logger.info("=" * 70)
     logger.info("  BLE Diagnostic Tool - Scan ALL Devices")
     logger.info("=" * 70)
@@ -52,23 +123,29 @@ def main():
         return 1
 
     logger.info(f"✅ Scanner BLE iniciado")
-    logger.info(f"   Adaptador: {scanner.adapter.identifier()}")
-    logger.info(f"   Endereço: {scanner.adapter.address()}")
+    logger.info(f"   Adaptador: {scanner.adapter_identifier}")
+    logger.info(f"   Endereço: {scanner.adapter_address}")
     logger.info("")
 
     # Fazer scan de TODOS os dispositivos (sem filtro)
     logger.info("🔍 A fazer scan de TODOS os dispositivos BLE...")
     logger.info("   Duração: 10 segundos (scan mais longo para aumentar chances)")
+    if args.expected_iot:
+        logger.info(f"   Termina mais cedo ao encontrar {args.expected_iot} dispositivos IoT")
     logger.info("   ATENÇÃO: Sem filtro - vai mostrar tudo!")
     logger.info("")
 
-    devices = scanner.scan(duration_ms=10000, filter_iot=False)
+    devices = scanner.scan(
+        duration_ms=10000,
+        filter_iot=False,
+        expected_iot_count=args.expected_iot,
+    )
 
-    logger.info("=" * 70)
-    logger.info(f"📊 RESULTADOS DO SCAN")
-    logger.info("=" * 70)
-    logger.info(f"Total de dispositivos BLE encontrados: {len(devices)}")
-    logger.info("")
+    logger.info(
+        "{sep}\n📊 RESULTADOS DO SCAN\n{sep}\nTotal de dispositivos BLE encontrados: {total}\n",
+        sep=SEPARATOR,
+        total=len(devices),
+    )
 
     if not devices:
         logger.warning("⚠️  NENHUM dispositivo BLE encontrado!")
@@ -85,67 +162,43 @@ def main():
         logger.warning("  > scan on")
         return 1
 
-    # Mostrar todos os dispositivos encontrados
-    iot_devices = []
-    other_devices = []
+    # Separar dispositivos IoT / outros numa única passagem
+    iot_devices, other_devices = [], []
+    iot_append = iot_devices.append
+    other_append = other_devices.append
 
     for device in devices:
-        if device.has_iot_service():
-            iot_devices.append(device)
-        else:
-            other_devices.append(device)
+        (iot_append if device.has_iot_service() else other_append)(device)
 
-    # Mostrar dispositivos IoT (se houver)
+    # Mostrar dispositivos IoT (se houver) - um bloco por dispositivo.
+    # lazy=True: o bloco só é formatado se algum sink aceitar INFO.
     if iot_devices:
-        logger.info("✅ DISPOSITIVOS IoT NETWORK ENCONTRADOS:")
-        logger.info("")
+        logger.info("✅ DISPOSITIVOS IoT NETWORK ENCONTRADOS:\n")
         for i, device in enumerate(iot_devices, 1):
-            logger.info(f"  [{i}] {device.name or 'Unknown'}")
-            logger.info(f"      Endereço BLE: {device.address}")
-            logger.info(f"      RSSI: {device.rssi} dBm")
-            logger.info(f"      Service UUIDs anunciados:")
-            for uuid in device.service_uuids:
-                uuid_str = str(uuid)
-                marker = "  ← IoT Network Service" if uuid_str.lower() == IOT_NETWORK_SERVICE_UUID.lower() else ""
-                logger.info(f"        - {uuid_str}{marker}")
-            if device.manufacturer_data:
-                logger.info(f"      Manufacturer Data: {len(device.manufacturer_data)} entries")
-            logger.info("")
+            logger.opt(lazy=True).info("{}", partial(format_device_block, i, device, True))
     else:
-        logger.warning("⚠️  NENHUM dispositivo IoT Network encontrado")
-        logger.warning(f"    (procurando por Service UUID: {IOT_NETWORK_SERVICE_UUID})")
-        logger.warning("")
+        logger.warning(
+            "⚠️  NENHUM dispositivo IoT Network encontrado\n"
+            f"    (procurando por Service UUID: {IOT_NETWORK_SERVICE_UUID})\n"
+        )
 
     # Mostrar outros dispositivos
     if other_devices:
-        logger.info("📱 OUTROS DISPOSITIVOS BLE (não-IoT):")
-        logger.info("")
+        logger.info("📱 OUTROS DISPOSITIVOS BLE (não-IoT):\n")
         for i, device in enumerate(other_devices, 1):
-            logger.info(f"  [{i}] {device.name or 'Unknown'}")
-            logger.info(f"      Endereço BLE: {device.address}")
-            logger.info(f"      RSSI: {device.rssi} dBm")
-
-            if device.service_uuids:
-                logger.info(f"      Service UUIDs anunciados: {len(device.service_uuids)}")
-                for uuid in device.service_uuids:
-                    uuid_str = str(uuid)
-                    marker = "  ← IoT Network Service" if uuid_str.lower() == IOT_NETWORK_SERVICE_UUID.lower() else ""
-                    logger.info(f"        - {uuid_str}{marker}")
-            else:
-                logger.info(f"      Service UUIDs: <nenhum UUID anunciado>")
-
-            if device.manufacturer_data:
-                logger.info(f"      Manufacturer Data: {len(device.manufacturer_data)} entries")
-            logger.info("")
+            logger.opt(lazy=True).info("{}", partial(format_device_block, i, device, False))
 
     # Resumo final
-    logger.info("=" * 70)
-    logger.info("📋 RESUMO DO DIAGNÓSTICO")
-    logger.info("=" * 70)
-    logger.info(f"Total de dispositivos: {len(devices)}")
-    logger.info(f"Dispositivos IoT Network: {len(iot_devices)}")
-    logger.info(f"Outros dispositivos: {len(other_devices)}")
-    logger.info("")
+    logger.info(
+        "{sep}\n📋 RESUMO DO DIAGNÓSTICO\n{sep}\n"
+        "Total de dispositivos: {total}\n"
+        "Dispositivos IoT Network: {iot}\n"
+        "Outros dispositivos: {other}\n",
+        sep=SEPARATOR,
+        total=len(devices),
+        iot=len(iot_devices),
+        other=len(other_devices),
+    )
 
     if iot_devices:
         logger.info("✅ DIAGNÓSTICO: Tudo OK!")
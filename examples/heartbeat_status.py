@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Helper: Heartbeat Status
+
+Mostra o último heartbeat enviado pelo GATT Server, lendo apenas o fim do
+ficheiro de log do servidor (logs/test_gatt_server.log).
+
+Uso:
+    Terminal 1 (Server): sudo python3 examples/test_gatt_server.py hci0
+    Terminal 2:          python3 examples/heartbeat_status.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.utils.config import config
+
+# Log escrito pelo GATT Server (examples/test_gatt_server.py)
+SERVER_LOG = config.logs_dir / "test_gatt_server.log"
+
+# Janela lida do fim do log (o ficheiro pode ter vários MB)
+TAIL_BYTES = 64 * 1024
+
+
+def read_log_tail(log_path: Path, max_bytes: int = TAIL_BYTES) -> bytes:
+    """
+    Lê apenas o fim de um ficheiro de log.
+
+    Args:
+        log_path: Caminho do ficheiro de log
+        max_bytes: Número máximo de bytes a ler a partir do fim
+
+    Returns:
+        Últimos bytes do ficheiro (a primeira linha pode vir incompleta)
+    """
+    with open(log_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - max_bytes))
+        return f.read()
+
+
+def main():
+    """Main function."""
+
+    try:
+        tail = read_log_tail(SERVER_LOG)
+    except FileNotFoundError:
+        print(f"❌ Log do servidor não encontrado: {SERVER_LOG}")
+        print("   O GATT Server está a correr? (sudo python3 examples/test_gatt_server.py hci0)")
+        return 1
+
+    for line in reversed(tail.splitlines()):
+        if b"Heartbeat enviado" in line:
+            print("💓 Último heartbeat:")
+            print(f"   {line.decode('utf-8', errors='ignore')}")
+            return 0
+
+    print(f"⚠️  Nenhum heartbeat nos últimos {TAIL_BYTES // 1024} KB de {SERVER_LOG}")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,13 +11,17 @@ Uso:
 """
 
 import sys
-import time
 from pathlib import Path
 
 # Adicionar o diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from common.ble.gatt_client import BLEScanner, SIMPLEBLE_AVAILABLE
+from common.ble.gatt_client import (
+    BLEScanner,
+    SIMPLEBLE_AVAILABLE,
+    IOT_SERVICE_UUID_BYTES,
+    uuid_to_bytes,
+)
 from common.utils.constants import IOT_NETWORK_SERVICE_UUID
 from common.utils.logger import setup_logger
 
@@ -51,14 +55,18 @@ def main():
         logger.error(f"❌ Erro ao criar BLE Scanner: {e}")
         return 1
 
-    logger.info(f"✅ Scanner iniciado: {scanner.adapter.identifier()} ({scanner.adapter.address()})")
+    logger.info(f"✅ Scanner iniciado: {scanner.adapter_identifier} ({scanner.adapter_address})")
     logger.info("")
 
-    # Fazer 3 scans de 5 segundos cada
+    # Fazer até 3 scans de no máximo 5 segundos cada (termina ao encontrar um nó IoT)
     for attempt in range(1, 4):
-        logger.info(f"🔍 Tentativa {attempt}/3 - A fazer scan de 5 segundos...")
+        logger.info(f"🔍 Tentativa {attempt}/3 - A fazer scan (até 5 segundos)...")
 
-        devices = scanner.scan(duration_ms=5000, filter_iot=False)
+        devices = scanner.scan(
+            duration_ms=5000,
+            filter_iot=False,
+            expected_iot_count=1,
+        )
 
         logger.info(f"   Encontrados: {len(devices)} dispositivos")
 
@@ -80,7 +88,7 @@ def main():
             if iot_node.service_uuids:
                 logger.info(f"   Service UUIDs anunciados: {len(iot_node.service_uuids)}")
                 for uuid in iot_node.service_uuids:
-                    if uuid.lower() == IOT_NETWORK_SERVICE_UUID.lower():
+                    if uuid_to_bytes(uuid) in IOT_SERVICE_UUID_BYTES:
                         logger.info(f"      ✅ {uuid}  ← IoT Network Service (CORRETO!)")
                     else:
                         logger.info(f"      - {uuid}")
@@ -115,9 +123,10 @@ def main():
                 logger.warning("  adv.add_service_uuid(service.uuid)")
                 return 1
 
+        # Sem pausa entre tentativas: scan() só retorna depois de parar o scan
+        # no adaptador, por isso a tentativa seguinte pode começar logo
         if attempt < 3:
             logger.info(f"   'IoT-Node' não encontrado. A tentar novamente...\n")
-            time.sleep(1)
 
     # Não encontrou em nenhuma das 3 tentativas
     logger.error("")
@@ -6,31 +6,47 @@ Este script faz scan de dispositivos BLE e permite conectar a um deles.
 
 Uso:
     python3 examples/test_ble_client.py
+    python3 examples/test_ble_client.py --verbose   # lista todos os serviços GATT
 """
 
 import sys
 import time
+import argparse
 from pathlib import Path
 
 # Adicionar o diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from common.ble.gatt_client import BLEClient, SIMPLEBLE_AVAILABLE
+from common.ble.gatt_client import (
+    BLEClient,
+    SIMPLEBLE_AVAILABLE,
+    format_neighbor_rows,
+    format_service_tree,
+    parse_device_info,
+    parse_neighbor_table,
+)
 from common.utils.constants import (
     IOT_NETWORK_SERVICE_UUID,
     CHAR_DEVICE_INFO_UUID,
     CHAR_NEIGHBOR_TABLE_UUID,
 )
-from common.utils.nid import NID
 from common.utils.logger import setup_logger
 
 # Setup logger
 logger = setup_logger("test_ble_client")
 
 
-def main():
+def main(argv=None):
     """Main function."""
 
+    parser = argparse.ArgumentParser(description="BLE Client Test - IoT Network Scanner")
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Lista todos os serviços e características GATT do dispositivo",
+    )
+    args = parser.parse_args(argv)
+
     logger.info("=" * 60)
     logger.info("  BLE Client Test - IoT Network Scanner")
     logger.info("=" * 60)
@@ -60,10 +76,11 @@ def main():
 
     # Fazer scan de dispositivos IoT
     logger.info("🔍 A fazer scan de dispositivos IoT...")
-    logger.info("   (aguarda 5 segundos)")
+    logger.info("   (até 5 segundos; termina ao encontrar o primeiro)")
     logger.info("")
 
-    devices = client.scan_iot_devices(duration_ms=5000)
+    # Só é usado o primeiro dispositivo: não esperar pelo fim do scan
+    devices = client.scan_iot_devices(duration_ms=5000, expected_count=1)
 
     if not devices:
         logger.warning("⚠️  Nenhum dispositivo IoT encontrado")
@@ -103,17 +120,22 @@ def main():
     logger.info("🔍 A explorar serviços GATT...")
     services = conn.get_services()
 
-    logger.info(f"   Encontrados {len(services)} serviços:")
+    logger.info(f"   Encontrados {len(services)} serviços")
     logger.info("")
 
-    for service in services:
-        logger.info(f"   📦 Service: {service.uuid}")
-        for char in service.characteristics:
-            caps_str = ', '.join(char.capabilities)
-            logger.info(f"      - Characteristic: {char.uuid}")
-            logger.info(f"        Capabilities: {caps_str}")
+    # Listagem completa só com --verbose; o serviço IoT é resolvido
+    # diretamente pelo UUID (lookup no índice da ligação)
+    if args.verbose and services:
+        logger.info(format_service_tree(services, indent="   "))
         logger.info("")
 
+    iot_service = conn.get_service(IOT_NETWORK_SERVICE_UUID)
+    if iot_service is None:
+        logger.warning("⚠️  O dispositivo não expõe o IoT Network Service")
+    else:
+        logger.info(f"   📦 IoT Network Service: {len(iot_service.characteristics)} características")
+    logger.info("")
+
     # Ler DeviceInfo
     logger.info("=" * 60)
     logger.info("📖 A ler DeviceInfo Characteristic...")
@@ -127,22 +149,18 @@ def main():
 
     if device_info_data:
         logger.info(f"✅ DeviceInfo lida: {len(device_info_data)} bytes")
-        logger.info(f"   Dados (hex): {device_info_data.hex()}")
+        logger.opt(lazy=True).info("   Dados (hex): {}", device_info_data.hex)
 
         # Parse: NID (16) + hop_count (1) + device_type (1)
-        if len(device_info_data) >= 18:
-            nid_bytes = device_info_data[:16]
-            hop_count = device_info_data[16]
-            device_type_byte = device_info_data[17]
-
-            nid = NID(nid_bytes)
-            device_type = 'sink' if device_type_byte == 0 else 'node'
+        device_info = parse_device_info(device_info_data)
+        if device_info:
+            nid = device_info['nid']
 
             logger.info("")
             logger.info(f"   📱 NID: {nid.to_string()}")
             logger.info(f"      Short: {nid}")
-            logger.info(f"   🔢 Hop Count: {hop_count}")
-            logger.info(f"   🏷️  Device Type: {device_type}")
+            logger.info(f"   🔢 Hop Count: {device_info['hop_count']}")
+            logger.info(f"   🏷️  Device Type: {device_info['device_type']}")
     else:
         logger.error("❌ Falha ao ler DeviceInfo")
 
@@ -161,26 +179,16 @@ def main():
 
     if neighbor_data:
         logger.info(f"✅ NeighborTable lida: {len(neighbor_data)} bytes")
-        logger.info(f"   Dados (hex): {neighbor_data.hex()}")
-
-        # Parse: num_neighbors (1) + N * (NID (16) + hop_count (1))
-        if len(neighbor_data) >= 1:
-            num_neighbors = neighbor_data[0]
-            logger.info(f"   👥 Número de vizinhos: {num_neighbors}")
-
-            if num_neighbors > 0:
-                logger.info("")
-                offset = 1
-                for i in range(num_neighbors):
-                    if offset + 17 <= len(neighbor_data):
-                        nid_bytes = neighbor_data[offset:offset+16]
-                        hop_count = neighbor_data[offset+16]
-
-                        neighbor_nid = NID(nid_bytes)
-                        logger.info(f"   {i+1}. NID: {neighbor_nid}")
-                        logger.info(f"      Hop Count: {hop_count}")
-
-                        offset += 17
+        logger.opt(lazy=True).info("   Dados (hex): {}", neighbor_data.hex)
+
+        # Parse: num_neighbors (1) + N * (NID (16) + hop_count (1) + reserved (1))
+        num_neighbors = neighbor_data[0]
+        logger.info(f"   👥 Número de vizinhos: {num_neighbors}")
+
+        neighbors = parse_neighbor_table(neighbor_data)
+        if neighbors:
+            logger.info("")
+            logger.info(format_neighbor_rows(neighbors, indent="   "))
     else:
         logger.error("❌ Falha ao ler NeighborTable")
 
@@ -7,36 +7,69 @@ Pode ser usado para testar a implementação base do GATT Server.
 
 Uso:
     sudo python3 examples/test_gatt_server.py hci0
+
+A neighbor table pode ser alterada com examples/trigger_neighbor_update.py:
+o servidor monitoriza o ficheiro de trigger (inotify, sem polling).
 """
 
+import os
 import sys
 import signal
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
 
 # Adicionar o diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from common.ble.gatt_server import Application, register_application
-from common.ble.gatt_services import IoTNetworkService
-from common.ble.advertising import Advertisement, register_advertisement
 from common.utils.nid import NID
 from common.utils.logger import setup_logger
-from common.protocol.heartbeat import create_heartbeat_packet
+from common.protocol.heartbeat import HeartbeatTemplate
 from common.utils.constants import HEARTBEAT_INTERVAL
 
 # Setup logger
 logger = setup_logger("test_gatt_server")
 
-# Global mainloop
-mainloop = None
+# Ficheiro de trigger na raiz do projeto (independente do diretório atual,
+# para o servidor e examples/trigger_neighbor_update.py usarem o mesmo)
+TRIGGER_FILE = Path(__file__).resolve().parent.parent / "trigger_neighbor_update.txt"
+
+# Intervalo entre mudanças simuladas na neighbor table (segundos)
+NEIGHBOR_UPDATE_INTERVAL = 10
 
+# Resposta de autenticação (constante partilhada por todos os pedidos)
+AUTH_OK_RESPONSE = b"AUTH_OK"
 
-def signal_handler(sig, frame):
-    """Handler para Ctrl+C."""
-    logger.info("\nA terminar...")
-    if mainloop:
+
+@contextmanager
+def quit_on_signals(mainloop) -> Iterator[None]:
+    """
+    Termina o mainloop com SIGINT/SIGTERM enquanto o contexto estiver ativo.
+
+    Os sinais são tratados pelo próprio GLib (GLib.unix_signal_add): o
+    callback corre dentro do mainloop, sem handlers Python globais nem
+    KeyboardInterrupt a interromper o mainloop. As fontes são removidas à
+    saída, por isso uma nova chamada a main() não acumula handlers.
+
+    Args:
+        mainloop: GLib.MainLoop a terminar
+    """
+    from gi.repository import GLib
+
+    def on_signal():
+        logger.info("\nA terminar...")
         mainloop.quit()
-    sys.exit(0)
+        return GLib.SOURCE_CONTINUE
+
+    source_ids = [
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, sig, on_signal)
+        for sig in (signal.SIGINT, signal.SIGTERM)
+    ]
+    try:
+        yield
+    finally:
+        for source_id in source_ids:
+            GLib.source_remove(source_id)
 
 
 def packet_received_callback(packet_bytes: bytes):
@@ -46,8 +79,42 @@ def packet_received_callback(packet_bytes: bytes):
     Args:
         packet_bytes: Bytes do pacote
     """
-    logger.info(f"📦 Pacote recebido: {len(packet_bytes)} bytes")
-    logger.info(f"   Dados (hex): {packet_bytes.hex()}")
+    logger.info("📦 Pacote recebido: {} bytes", len(packet_bytes))
+    # hex só é calculado se a mensagem for mesmo registada
+    logger.opt(lazy=True).info("   Dados (hex): {}", packet_bytes.hex)
+
+
+def load_neighbor_trigger(path: Path) -> Optional[List[Dict[str, Any]]]:
+    """
+    Lê os vizinhos do ficheiro de trigger.
+
+    Formato: número de vizinhos na primeira linha, depois uma linha
+    "<nid>,<hop_count>" por vizinho.
+
+    Args:
+        path: Caminho do ficheiro de trigger
+
+    Returns:
+        Lista de dicts com 'nid' e 'hop_count', ou None se o ficheiro não
+        existir ou for inválido
+    """
+    try:
+        lines = path.read_text().splitlines()
+    except FileNotFoundError:
+        return None
+
+    neighbors = []
+    try:
+        for line in lines[1:]:
+            if not line.strip():
+                continue
+            nid_str, hop_count = line.split(',')
+            neighbors.append({'nid': NID(nid_str.strip()), 'hop_count': int(hop_count)})
+    except ValueError as e:
+        logger.warning(f"⚠️  Ficheiro de trigger inválido ({path}): {e}")
+        return None
+
+    return neighbors
 
 
 def auth_callback(auth_data: bytes, sender: str) -> bytes:
@@ -61,16 +128,14 @@ def auth_callback(auth_data: bytes, sender: str) -> bytes:
     Returns:
         Resposta de autenticação
     """
-    logger.info(f"🔐 Auth request de {sender}: {len(auth_data)} bytes")
+    logger.info("🔐 Auth request de {}: {} bytes", sender, len(auth_data))
 
     # Resposta simples (em produção, processar certificado X.509)
-    response = b"AUTH_OK"
-    return response
+    return AUTH_OK_RESPONSE
 
 
 def main(argv):
     """Main function."""
-    global mainloop
 
     if len(argv) < 2:
         logger.error("Uso: sudo python3 test_gatt_server.py <hci_interface>")
@@ -79,6 +144,15 @@ def main(argv):
 
     adapter_name = argv[1]
 
+    # Módulos D-Bus/GLib só são importados depois de validar os argumentos
+    # (um erro de uso termina sem carregar o stack D-Bus)
+    import dbus
+    import dbus.mainloop.glib
+    from gi.repository import GLib, Gio
+    from common.ble.gatt_server import Application, register_application
+    from common.ble.gatt_services import IoTNetworkService
+    from common.ble.advertising import Advertisement, register_advertisement
+
     logger.info("=" * 60)
     logger.info("  GATT Server Test - IoT Network Service")
     logger.info("=" * 60)
@@ -89,8 +163,6 @@ def main(argv):
     logger.info(f"   Short: {device_nid}")
 
     # Criar Application D-Bus
-    import dbus
-    import dbus.mainloop.glib
     dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
     bus = dbus.SystemBus()
 
@@ -113,12 +185,10 @@ def main(argv):
     # Atualizar hop count (simulando dispositivo conectado)
     service.get_device_info_characteristic().update_hop_count(1)
 
-    # Simular vizinhos
-    neighbors = [
-        {'nid': NID.generate(), 'hop_count': 0},
-        {'nid': NID.generate(), 'hop_count': 1},
-    ]
-    service.get_neighbor_characteristic().update_neighbors(neighbors)
+    # Vizinhos simulados: gerados uma única vez e reutilizados pelo timer
+    # (cada atualização usa os primeiros N, sem gerar NIDs novos)
+    neighbor_pool = [{'nid': NID.generate(), 'hop_count': i} for i in range(4)]
+    service.get_neighbor_characteristic().update_neighbors(neighbor_pool[:2])
 
     # Adicionar service à application
     app.add_service(service)
@@ -143,9 +213,7 @@ def main(argv):
     # Criar e registar Advertisement
     logger.info(f"\n📢 A criar BLE Advertisement...")
 
-    import dbus
-    bus = dbus.SystemBus()
-
+    # O advertisement usa a mesma ligação ao system bus da application
     adv = Advertisement(bus, 0, Advertisement.TYPE_PERIPHERAL)
     adv.add_service_uuid(service.uuid)  # Anunciar o IoT Network Service
     adv.set_local_name("IoT-Node")
@@ -160,78 +228,113 @@ def main(argv):
     register_advertisement(adv, adapter_name)
 
     # Timers para simular mudanças periódicas
-    from gi.repository import GLib
-
     neighbor_update_count = 0
+    trigger_applied = False
     heartbeat_sequence = 0
+    packet_characteristic = service.get_packet_characteristic()
+
+    # Heartbeat serializado uma vez; cada envio só atualiza sequência e timestamp
+    heartbeat_template = HeartbeatTemplate(device_nid)
 
     def simulate_neighbor_change():
-        """Simula mudanças periódicas na neighbor table."""
+        """Simula uma mudança na neighbor table (até ser aplicado um trigger)."""
         nonlocal neighbor_update_count
+
+        # Depois de um trigger, a neighbor table é a do ficheiro: parar a simulação
+        if trigger_applied:
+            logger.info("⏹️  Simulação da neighbor table desativada (trigger aplicado)")
+            return False  # Remover timer
+
         neighbor_update_count += 1
 
         # Alternar entre diferentes números de vizinhos
-        num_neighbors = (neighbor_update_count % 4) + 1  # 1, 2, 3, 4, 1, 2, ...
+        num_neighbors = (neighbor_update_count % len(neighbor_pool)) + 1  # 1, 2, 3, 4, 1, 2, ...
 
-        new_neighbors = [
-            {'nid': NID.generate(), 'hop_count': i}
-            for i in range(num_neighbors)
-        ]
-
-        service.get_neighbor_characteristic().update_neighbors(new_neighbors)
+        # update_neighbors() guarda uma cópia ordenada: o pool não é alterado
+        service.get_neighbor_characteristic().update_neighbors(neighbor_pool[:num_neighbors])
         logger.info(f"🔄 Neighbor table atualizada: {num_neighbors} vizinhos (update #{neighbor_update_count})")
 
         return True  # Continuar timer
 
     def send_heartbeat():
-        """Envia heartbeat periódico via NetworkPacketCharacteristic."""
+        """Envia um heartbeat via NetworkPacketCharacteristic."""
         nonlocal heartbeat_sequence
         heartbeat_sequence += 1
 
-        # Criar pacote de heartbeat
-        heartbeat_packet = create_heartbeat_packet(
-            sink_nid=device_nid,
-            sequence=heartbeat_sequence,
-        )
-
-        # Serializar e enviar via notify
-        packet_bytes = heartbeat_packet.to_bytes()
-        service.get_packet_characteristic().notify_packet(packet_bytes)
+        # Gerar o pacote a partir do template e enviar via notify
+        packet_bytes = heartbeat_template.build(heartbeat_sequence)
+        packet_characteristic.notify_packet(packet_bytes)
 
         logger.info(f"💓 Heartbeat enviado: seq={heartbeat_sequence}, size={len(packet_bytes)} bytes")
 
         return True  # Continuar timer
 
-    # Agendar mudanças a cada 10 segundos (neighbor table)
-    GLib.timeout_add_seconds(10, simulate_neighbor_change)
-    logger.info("⏲️  Timer configurado: neighbor table será atualizada a cada 10 segundos")
+    # Agendar mudanças a cada NEIGHBOR_UPDATE_INTERVAL segundos (neighbor table)
+    GLib.timeout_add_seconds(NEIGHBOR_UPDATE_INTERVAL, simulate_neighbor_change)
+    logger.info(f"⏲️  Timer configurado: neighbor table será atualizada a cada {NEIGHBOR_UPDATE_INTERVAL} segundos")
 
     # Agendar heartbeats a cada HEARTBEAT_INTERVAL segundos
     GLib.timeout_add_seconds(HEARTBEAT_INTERVAL, send_heartbeat)
     logger.info(f"💓 Timer configurado: heartbeats serão enviados a cada {HEARTBEAT_INTERVAL} segundos")
 
-    # Setup signal handler
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-
-    logger.info("\n" + "=" * 60)
-    logger.info("  ✅ GATT Server a correr com Advertising!")
-    logger.info("=" * 60)
-    logger.info("\nDispositivo visível e disponível para conexões BLE.")
-    logger.info("Pressione Ctrl+C para terminar.\n")
-
-    logger.info("📱 Para testar com bluetoothctl:")
-    logger.info("   1. bluetoothctl")
-    logger.info("   2. scan on  → deve aparecer 'IoT-Node'")
-    logger.info("   3. connect <MAC_ADDRESS>")
-    logger.info("   4. list-attributes")
-    logger.info("")
+    # Monitorizar o ficheiro de trigger (inotify): o callback só corre quando
+    # o ficheiro é escrito, sem acordar o servidor periodicamente para o ler.
+    # (mtime, tamanho) do último trigger aplicado
+    trigger_path = TRIGGER_FILE
+    last_trigger_state = None
+
+    def on_trigger_changed(monitor, changed_file, other_file, event_type):
+        """Aplica os vizinhos do ficheiro de trigger depois de uma escrita."""
+        nonlocal last_trigger_state, trigger_applied
+
+        # CHANGES_DONE_HINT chega quando o ficheiro é fechado (escrita completa)
+        if event_type != Gio.FileMonitorEvent.CHANGES_DONE_HINT:
+            return
+
+        # Só reler o ficheiro se mudou desde o último trigger aplicado (o GIO
+        # pode emitir mais de um CHANGES_DONE_HINT para a mesma escrita)
+        try:
+            stat = os.stat(trigger_path)
+        except FileNotFoundError:
+            return
+        trigger_state = (stat.st_mtime_ns, stat.st_size)
+        if trigger_state == last_trigger_state:
+            return
+        last_trigger_state = trigger_state
+
+        neighbors = load_neighbor_trigger(trigger_path)
+        if neighbors is None:
+            return
+
+        service.get_neighbor_characteristic().update_neighbors(neighbors)
+        trigger_applied = True
+        logger.info(f"📝 Neighbor table atualizada pelo trigger: {len(neighbors)} vizinhos")
+
+    # A referência ao monitor tem de se manter enquanto o mainloop corre
+    trigger_monitor = Gio.File.new_for_path(str(trigger_path)).monitor_file(
+        Gio.FileMonitorFlags.NONE, None
+    )
+    trigger_monitor.connect("changed", on_trigger_changed)
+    logger.info(f"👀 A monitorizar {TRIGGER_FILE} (examples/trigger_neighbor_update.py)")
+
+    # Estado do servidor num único registo de log
+    logger.info(
+        "\n{sep}\n"
+        "  ✅ GATT Server a correr com Advertising!\n"
+        "{sep}\n"
+        "\nDispositivo visível e disponível para conexões BLE.\n"
+        "Pressione Ctrl+C para terminar.\n\n"
+        "📱 Para testar com bluetoothctl:\n"
+        "   1. bluetoothctl\n"
+        "   2. scan on  → deve aparecer 'IoT-Node'\n"
+        "   3. connect <MAC_ADDRESS>\n"
+        "   4. list-attributes\n",
+        sep="=" * 60,
+    )
 
-    # Run mainloop
-    try:
+    # Run mainloop (SIGINT/SIGTERM terminam-no apenas enquanto corre)
+    with quit_on_signals(mainloop):
         mainloop.run()
-    except KeyboardInterrupt:
-        logger.info("\nA terminar...")
 
     return 0
 
@@ -12,20 +12,122 @@ Uso:
 
 import sys
 import time
+import queue
+import threading
 from pathlib import Path
+from typing import Optional
 
 # Adicionar o diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from common.ble.gatt_client import BLEClient, SIMPLEBLE_AVAILABLE
-from common.utils.constants import IOT_NETWORK_SERVICE_UUID, CHAR_NETWORK_PACKET_UUID
+from common.utils.constants import (
+    IOT_NETWORK_SERVICE_UUID,
+    CHAR_NETWORK_PACKET_UUID,
+    HEARTBEAT_INTERVAL,
+)
 from common.utils.logger import setup_logger
-from common.protocol.heartbeat import parse_heartbeat_packet, HeartbeatMonitor
+from common.protocol.heartbeat import (
+    HeartbeatMonitor,
+    HeartbeatPayload,
+    PLACEHOLDER_SIGNATURE,
+    parse_heartbeat_packet,
+)
 from common.network.packet import Packet
 
 # Setup logger
 logger = setup_logger("test_heartbeat_notifications")
 
+# Intervalo entre linhas de status (segundos)
+STATUS_INTERVAL = 15
+
+# Notificações à espera de processamento (se encher, as novas são descartadas)
+NOTIFICATION_QUEUE_SIZE = 256
+
+
+def format_packet_details(packet: Packet) -> str:
+    """
+    Formata os campos do cabeçalho de um pacote (um campo por linha).
+
+    Args:
+        packet: Pacote recebido
+
+    Returns:
+        Texto multi-linha
+    """
+    return "\n".join([
+        "   📦 Pacote parseado:",
+        f"      Source: {packet.source}",
+        f"      Destination: {packet.destination}",
+        f"      Type: {packet.msg_type} (0x{packet.msg_type:02x})",
+        f"      TTL: {packet.ttl}",
+        f"      Sequence: {packet.sequence}",
+        f"      Payload size: {len(packet.payload)} bytes",
+    ])
+
+
+def format_monitor_stats(stats: dict) -> str:
+    """
+    Formata as estatísticas do HeartbeatMonitor.
+
+    Args:
+        stats: Resultado de HeartbeatMonitor.get_stats()
+
+    Returns:
+        Texto multi-linha
+    """
+    return "\n".join([
+        "   📊 Monitor Stats:",
+        f"      Total heartbeats: {stats['total_received']}",
+        f"      Time since last: {stats['time_since_last']:.2f}s",
+        f"      Missed count: {stats['missed_count']}",
+    ])
+
+
+def format_notification_report(
+    number: int,
+    data: bytes,
+    packet: Optional[Packet],
+    heartbeat: Optional[HeartbeatPayload],
+    sequence_ok: Optional[bool],
+) -> str:
+    """
+    Formata o resumo de uma notificação recebida.
+
+    Args:
+        number: Número da notificação
+        data: Bytes recebidos
+        packet: Pacote parseado (None se o parse falhou)
+        heartbeat: Heartbeat extraído (None se o pacote não for heartbeat)
+        sequence_ok: True se a sequência é a esperada (None se não foi verificada)
+
+    Returns:
+        Texto multi-linha (com linha vazia antes e depois)
+    """
+    # hex calculado sobre uma vista dos primeiros 32 bytes, sem copiar o slice
+    lines = [
+        "",
+        f"🔔 NOTIFICAÇÃO #{number} RECEBIDA!",
+        f"   📊 Dados completos ({len(data)} bytes): {memoryview(data)[:32].hex()}...",
+    ]
+
+    if heartbeat is not None:
+        signature = '<placeholder>' if heartbeat.signature == PLACEHOLDER_SIGNATURE else '<signed>'
+        lines.extend([
+            "   💓 HEARTBEAT DETECTADO!",
+            f"      Sink NID: {heartbeat.sink_nid}",
+            f"      Timestamp: {heartbeat.timestamp:.2f}",
+            f"      Age: {heartbeat.age():.2f}s",
+            f"      Signature: {signature}",
+        ])
+        if sequence_ok:
+            lines.append(f"      ✅ Sequência correta ({packet.sequence})")
+    elif packet is not None:
+        lines.append(f"   ℹ️  Pacote não é heartbeat (tipo: 0x{packet.msg_type:02x})")
+
+    lines.append("")
+    return "\n".join(lines)
+
 
 def main():
     """Main function."""
@@ -47,9 +149,10 @@ def main():
         logger.error(f"❌ Erro ao criar BLE Client: {e}")
         return 1
 
-    # Fazer scan de dispositivos IoT
+    # Fazer scan de dispositivos IoT (só interessa o primeiro: o scan
+    # termina assim que o encontrar, até 5 segundos)
     logger.info("🔍 A fazer scan de dispositivos IoT...")
-    devices = client.scan_iot_devices(duration_ms=5000)
+    devices = client.scan_iot_devices(duration_ms=5000, expected_count=1)
 
     if not devices:
         logger.warning("⚠️  Nenhum dispositivo IoT encontrado")
@@ -80,63 +183,73 @@ def main():
     heartbeat_count = 0
     last_sequence = None
 
-    def notification_handler(data: bytes):
-        """Handler para notificações de pacotes."""
+    # Sinalizado pelo handler a cada heartbeat (acorda o ciclo principal)
+    heartbeat_event = threading.Event()
+
+    # Notificações recebidas, processadas fora da thread do callback BLE
+    notification_queue: "queue.Queue[bytes]" = queue.Queue(maxsize=NOTIFICATION_QUEUE_SIZE)
+
+    def process_notification(data: bytes):
+        """Processa uma notificação de pacote (parse, heartbeat, logs)."""
         nonlocal notification_count, heartbeat_count, last_sequence
 
         notification_count += 1
-
-        logger.info("")
-        logger.info(f"🔔 NOTIFICAÇÃO #{notification_count} RECEBIDA!")
-        logger.info(f"   📊 Dados completos ({len(data)} bytes): {data[:32].hex()}...")
+        number = notification_count
+        packet = None
+        heartbeat = None
+        sequence_ok = None
 
         try:
-            # Parsear pacote
+            # Parsear pacote (detalhe do cabeçalho só em DEBUG)
             packet = Packet.from_bytes(data)
-            logger.info(f"   📦 Pacote parseado:")
-            logger.info(f"      Source: {packet.source}")
-            logger.info(f"      Destination: {packet.destination}")
-            logger.info(f"      Type: {packet.msg_type} (0x{packet.msg_type:02x})")
-            logger.info(f"      TTL: {packet.ttl}")
-            logger.info(f"      Sequence: {packet.sequence}")
-            logger.info(f"      Payload size: {len(packet.payload)} bytes")
+            logger.opt(lazy=True).debug("{}", lambda: format_packet_details(packet))
 
             # Verificar se é heartbeat
             heartbeat = parse_heartbeat_packet(packet)
             if heartbeat:
                 heartbeat_count += 1
                 monitor.on_heartbeat_received(heartbeat)
-
-                logger.info(f"   💓 HEARTBEAT DETECTADO!")
-                logger.info(f"      Sink NID: {heartbeat.sink_nid}")
-                logger.info(f"      Timestamp: {heartbeat.timestamp:.2f}")
-                logger.info(f"      Age: {heartbeat.age():.2f}s")
-                logger.info(f"      Signature: {'<placeholder>' if heartbeat.signature == b'\\x00' * 64 else '<signed>'}")
+                heartbeat_event.set()
 
                 # Verificar sequência
                 if last_sequence is not None:
                     expected = last_sequence + 1
-                    if packet.sequence != expected:
-                        logger.warning(f"      ⚠️  Sequência inesperada! Esperado: {expected}, Recebido: {packet.sequence}")
-                    else:
-                        logger.info(f"      ✅ Sequência correta ({packet.sequence})")
+                    sequence_ok = packet.sequence == expected
+                    if not sequence_ok:
+                        logger.warning("      ⚠️  Sequência inesperada! Esperado: {}, Recebido: {}", expected, packet.sequence)
 
                 last_sequence = packet.sequence
 
-                # Mostrar estatísticas do monitor
-                stats = monitor.get_stats()
-                logger.info(f"   📊 Monitor Stats:")
-                logger.info(f"      Total heartbeats: {stats['total_received']}")
-                logger.info(f"      Time since last: {stats['time_since_last']:.2f}s")
-                logger.info(f"      Missed count: {stats['missed_count']}")
-
-            else:
-                logger.info(f"   ℹ️  Pacote não é heartbeat (tipo: 0x{packet.msg_type:02x})")
+                # Estatísticas do monitor (só calculadas se o DEBUG estiver ativo)
+                logger.opt(lazy=True).debug("{}", lambda: format_monitor_stats(monitor.get_stats()))
 
         except Exception as e:
             logger.error(f"   ❌ Erro ao parsear pacote: {e}")
 
-        logger.info("")
+        # Um único registo INFO por notificação: o texto (hex, campos do
+        # heartbeat) só é montado se o registo for mesmo emitido
+        logger.opt(lazy=True).info(
+            "{}", lambda: format_notification_report(number, data, packet, heartbeat, sequence_ok)
+        )
+
+    def notification_worker():
+        """Processa as notificações da fila, por ordem de chegada."""
+        while True:
+            process_notification(notification_queue.get())
+
+    def notification_handler(data: bytes):
+        """
+        Handler para notificações de pacotes.
+
+        Corre na thread do stack BLE: apenas enfileira os dados e retorna,
+        para não atrasar a entrega das notificações seguintes.
+        """
+        try:
+            notification_queue.put_nowait(bytes(data))
+        except queue.Full:
+            logger.warning("⚠️  Fila de notificações cheia - notificação descartada")
+
+    threading.Thread(target=notification_worker, name="notification-worker", daemon=True).start()
 
     # Subscrever notificações
     logger.info("=" * 70)
@@ -172,20 +285,26 @@ def main():
     logger.info("=" * 70)
     logger.info("")
 
-    # Aguardar por notificações (mantém conexão ativa)
+    # Aguardar por notificações (mantém conexão ativa).
+    # O ciclo dorme até chegar um heartbeat, até ser altura do próximo status
+    # ou até passar o threshold de timeout - sem acordar a cada segundo. Se
+    # nenhum heartbeat chegar dentro do threshold, o timeout é verificado logo.
+    timeout_threshold = HEARTBEAT_INTERVAL * (monitor.timeout_count + 1)
+    next_status = time.monotonic() + STATUS_INTERVAL
     try:
         while True:
-            time.sleep(1)
-
-            # A cada 15 segundos, mostra status e verifica timeout
-            if int(time.time()) % 15 == 0:
+            wait_time = min(timeout_threshold, next_status - time.monotonic())
+            if heartbeat_event.wait(timeout=max(0.0, wait_time)):
+                heartbeat_event.clear()
+            elif monitor.check_timeout():
+                logger.error("💔 TIMEOUT! Não recebemos heartbeats há muito tempo!")
+                logger.error("   O servidor pode ter crashado ou perdemos conexão.")
+
+            # A cada STATUS_INTERVAL segundos, mostra status
+            if time.monotonic() >= next_status:
+                next_status += STATUS_INTERVAL
                 logger.info(f"⏱️  Status: {notification_count} notificações, {heartbeat_count} heartbeats")
 
-                # Verificar timeout
-                if monitor.check_timeout():
-                    logger.error("💔 TIMEOUT! Não recebemos heartbeats há muito tempo!")
-                    logger.error("   O servidor pode ter crashado ou perdemos conexão.")
-
     except KeyboardInterrupt:
         logger.info("")
         logger.info("=" * 70)
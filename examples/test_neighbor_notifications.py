@@ -10,20 +10,22 @@ Uso:
 """
 
 import sys
-import time
+import threading
 from pathlib import Path
 
 # Adicionar o diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from common.ble.gatt_client import BLEClient, SIMPLEBLE_AVAILABLE
+from common.ble.gatt_client import BLEClient, SIMPLEBLE_AVAILABLE, format_neighbor_rows, parse_neighbor_table
 from common.utils.constants import IOT_NETWORK_SERVICE_UUID, CHAR_NEIGHBOR_TABLE_UUID
-from common.utils.nid import NID
 from common.utils.logger import setup_logger
 
 # Setup logger
 logger = setup_logger("test_neighbor_notifications")
 
+# Intervalo entre linhas de status (segundos)
+STATUS_INTERVAL = 10
+
 
 def main():
     """Main function."""
@@ -45,9 +47,10 @@ def main():
         logger.error(f"❌ Erro ao criar BLE Client: {e}")
         return 1
 
-    # Fazer scan de dispositivos IoT
+    # Fazer scan de dispositivos IoT (só interessa o primeiro: o scan
+    # termina assim que o encontrar, até 5 segundos)
     logger.info("🔍 A fazer scan de dispositivos IoT...")
-    devices = client.scan_iot_devices(duration_ms=5000)
+    devices = client.scan_iot_devices(duration_ms=5000, expected_count=1)
 
     if not devices:
         logger.warning("⚠️  Nenhum dispositivo IoT encontrado")
@@ -68,23 +71,6 @@ def main():
     logger.info("✅ Conectado com sucesso!")
     logger.info("")
 
-    # Ler neighbor table inicial
-    logger.info("📖 A ler Neighbor Table inicial...")
-    initial_data = conn.read_characteristic(
-        IOT_NETWORK_SERVICE_UUID,
-        CHAR_NEIGHBOR_TABLE_UUID
-    )
-
-    if initial_data:
-        num_neighbors = initial_data[0]
-        logger.info(f"   👥 Vizinhos iniciais: {num_neighbors}")
-        logger.info(f"   Dados (hex): {initial_data.hex()}")
-    else:
-        logger.error("❌ Falha ao ler Neighbor Table")
-        return 1
-
-    logger.info("")
-
     # Contador de notificações recebidas
     notification_count = 0
     last_neighbors_count = None
@@ -97,33 +83,19 @@ def main():
         num_neighbors = data[0]
 
         logger.info("")
-        logger.info(f"🔔 NOTIFICAÇÃO #{notification_count} RECEBIDA!")
-        logger.info(f"   👥 Número de vizinhos: {num_neighbors}")
-        logger.info(f"   📊 Dados completos ({len(data)} bytes): {data.hex()}")
+        logger.info("🔔 NOTIFICAÇÃO #{} RECEBIDA!", notification_count)
+        logger.info("   👥 Número de vizinhos: {}", num_neighbors)
+        # hex só é calculado se a mensagem for mesmo registada
+        logger.opt(lazy=True).info("   📊 Dados completos ({} bytes): {}", lambda: len(data), data.hex)
 
-        # Parse dos vizinhos
+        # Parse dos vizinhos (tabela montada e registada num único log)
         if num_neighbors > 0:
-            logger.info(f"   📋 Lista de vizinhos:")
-            offset = 1
-            for i in range(num_neighbors):
-                if offset + 18 <= len(data):
-                    nid_bytes = data[offset:offset+16]
-                    hop_count = data[offset+16]
-                    reserved = data[offset+17]
-
-                    # Converter signed byte se necessário
-                    if hop_count > 127:
-                        hop_count = hop_count - 256
-
-                    nid = NID(nid_bytes)
-                    logger.info(f"      {i+1}. NID: {nid}")
-                    logger.info(f"         Hop Count: {hop_count}")
-
-                    offset += 18
+            neighbors = parse_neighbor_table(data)
+            logger.info("   📋 Lista de vizinhos:\n" + format_neighbor_rows(neighbors, indent="      "))
 
         # Verificar se mudou
         if last_neighbors_count is not None and last_neighbors_count != num_neighbors:
-            logger.info(f"   ⚠️  MUDANÇA DETECTADA: {last_neighbors_count} → {num_neighbors} vizinhos")
+            logger.info("   ⚠️  MUDANÇA DETECTADA: {} → {} vizinhos", last_neighbors_count, num_neighbors)
 
         last_neighbors_count = num_neighbors
         logger.info("")
@@ -146,6 +118,26 @@ def main():
 
     logger.info("✅ Subscrição bem-sucedida!")
     logger.info("")
+
+    # Ler neighbor table inicial logo a seguir à subscrição (sem pausa entre
+    # os dois pedidos, e sem perder mudanças que aconteçam entretanto)
+    logger.info("📖 A ler Neighbor Table inicial...")
+    initial_data = conn.read_characteristic(
+        IOT_NETWORK_SERVICE_UUID,
+        CHAR_NEIGHBOR_TABLE_UUID
+    )
+
+    if initial_data:
+        num_neighbors = initial_data[0]
+        logger.info(f"   👥 Vizinhos iniciais: {num_neighbors}")
+        logger.opt(lazy=True).info("   Dados (hex): {}", initial_data.hex)
+        last_neighbors_count = num_neighbors
+    else:
+        logger.error("❌ Falha ao ler Neighbor Table")
+        return 1
+
+    logger.info("")
+
     logger.info("=" * 70)
     logger.info("📝 INSTRUÇÕES:")
     logger.info("=" * 70)
@@ -165,14 +157,13 @@ def main():
     logger.info("=" * 70)
     logger.info("")
 
-    # Aguardar por notificações (mantém conexão ativa)
+    # Aguardar por notificações (mantém conexão ativa). As notificações chegam
+    # pelo callback; o ciclo principal só acorda uma vez por STATUS_INTERVAL
+    # para mostrar o status (em vez de acordar a cada segundo)
+    stop_event = threading.Event()
     try:
-        while True:
-            time.sleep(1)
-
-            # A cada 10 segundos, mostra status
-            if int(time.time()) % 10 == 0:
-                logger.info(f"⏱️  Ainda a aguardar... ({notification_count} notificações recebidas até agora)")
+        while not stop_event.wait(timeout=STATUS_INTERVAL):
+            logger.info(f"⏱️  Ainda a aguardar... ({notification_count} notificações recebidas até agora)")
 
     except KeyboardInterrupt:
         logger.info("")
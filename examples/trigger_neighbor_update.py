@@ -22,31 +22,46 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from common.utils.nid import NID
 
+# Ficheiro de trigger na raiz do projeto, independente do diretório atual
+# (o mesmo que examples/test_gatt_server.py monitoriza)
+TRIGGER_FILE = Path(__file__).resolve().parent.parent / "trigger_neighbor_update.txt"
+
+
+def _write_output(lines):
+    """Escreve todas as linhas para stdout numa única operação."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
 
 def main(argv):
     """Main function."""
 
+    # Todo o output é acumulado e escrito de uma só vez no fim
+    out = []
+
     if len(argv) < 2:
-        print("Uso: python3 trigger_neighbor_update.py <num_neighbors>")
-        print("")
-        print("Exemplos:")
-        print("  python3 trigger_neighbor_update.py 1")
-        print("  python3 trigger_neighbor_update.py 3")
-        print("  python3 trigger_neighbor_update.py 0")
+        out.extend([
+            "Uso: python3 trigger_neighbor_update.py <num_neighbors>",
+            "",
+            "Exemplos:",
+            "  python3 trigger_neighbor_update.py 1",
+            "  python3 trigger_neighbor_update.py 3",
+            "  python3 trigger_neighbor_update.py 0",
+        ])
+        _write_output(out)
         return 1
 
     try:
         num_neighbors = int(argv[1])
     except ValueError:
-        print(f"❌ Erro: '{argv[1]}' não é um número válido")
+        _write_output([f"❌ Erro: '{argv[1]}' não é um número válido"])
         return 1
 
     if num_neighbors < 0 or num_neighbors > 10:
-        print(f"❌ Erro: Número de vizinhos deve estar entre 0 e 10")
+        _write_output([f"❌ Erro: Número de vizinhos deve estar entre 0 e 10"])
         return 1
 
-    print(f"🔧 A preparar trigger para {num_neighbors} vizinhos...")
-    print("")
+    out.append(f"🔧 A preparar trigger para {num_neighbors} vizinhos...")
+    out.append("")
 
     # Gerar vizinhos aleatórios
     neighbors = []
@@ -54,31 +69,27 @@ def main(argv):
         nid = NID.generate()
         hop_count = i  # Hop count incrementa
         neighbors.append({'nid': nid, 'hop_count': hop_count})
-        print(f"  Vizinho {i+1}:")
-        print(f"    NID: {nid}")
-        print(f"    Hop Count: {hop_count}")
+        out.append(f"  Vizinho {i+1}:")
+        out.append(f"    NID: {nid}")
+        out.append(f"    Hop Count: {hop_count}")
 
     # Criar ficheiro trigger
-    trigger_file = Path("trigger_neighbor_update.txt")
+    trigger_file = TRIGGER_FILE
 
     with open(trigger_file, 'w') as f:
         f.write(f"{num_neighbors}\n")
         for neighbor in neighbors:
             f.write(f"{neighbor['nid'].to_string()},{neighbor['hop_count']}\n")
 
-    print("")
-    print(f"✅ Ficheiro trigger criado: {trigger_file}")
-    print("")
-    print("📝 PRÓXIMO PASSO:")
-    print("   O servidor precisa monitorizar este ficheiro e aplicar as mudanças.")
-    print("   Atualmente isto é manual - vais precisar modificar test_gatt_server.py")
-    print("   para incluir um FileSystemWatcher ou atualizar manualmente.")
-    print("")
-    print("💡 SOLUÇÃO RÁPIDA:")
-    print("   1. Para no servidor (Ctrl+C)")
-    print("   2. Modifica o código para ler este ficheiro no início")
-    print("   3. Reinicia o servidor")
-    print("")
+    out.extend([
+        "",
+        f"✅ Ficheiro trigger criado: {trigger_file}",
+        "",
+        "📝 O servidor (test_gatt_server.py) monitoriza este ficheiro e aplica",
+        "   as mudanças assim que a escrita termina.",
+        "",
+    ])
+    _write_output(out)
 
     return 0
 
@@ -0,0 +1,80 @@
+"""
+Testes do scan com paragem antecipada (BLEScanner.scan com expected_iot_count).
+"""
+
+from unittest.mock import Mock
+
+from common.ble.gatt_client import BLEScanner
+from common.utils.constants import IOT_NETWORK_SERVICE_UUID
+
+
+class FakeService:
+    def __init__(self, uuid):
+        self._uuid = uuid
+
+    def uuid(self):
+        return self._uuid
+
+
+class FakePeripheral:
+    def __init__(self, address, service_uuids=()):
+        self._address = address
+        self.service_uuids = list(service_uuids)
+
+    def address(self):
+        return self._address
+
+    def identifier(self):
+        return "IoT-Node"
+
+    def rssi(self):
+        return -50
+
+    def services(self):
+        return [FakeService(uuid) for uuid in self.service_uuids]
+
+    def manufacturer_data(self):
+        return {}
+
+
+class FakeAdapter:
+    """Adaptador em que o Service UUID só chega numa atualização do advertisement."""
+
+    def __init__(self, peripheral):
+        self.peripheral = peripheral
+        self.on_found = None
+        self.on_updated = None
+
+    def set_callback_on_scan_found(self, callback):
+        self.on_found = callback
+
+    def set_callback_on_scan_updated(self, callback):
+        self.on_updated = callback
+
+    def scan_start(self):
+        # Primeiro advertisement sem service UUIDs, depois a scan response com eles
+        self.on_found(self.peripheral)
+        self.peripheral.service_uuids = [IOT_NETWORK_SERVICE_UUID]
+        self.on_updated(self.peripheral)
+
+    def scan_stop(self):
+        pass
+
+
+def make_scanner(adapter):
+    scanner = BLEScanner.__new__(BLEScanner)
+    scanner.adapter = adapter
+    scanner.ble_log = Mock()
+    scanner._peripherals = {}
+    return scanner
+
+
+def test_iot_service_in_scan_update_is_counted():
+    peripheral = FakePeripheral("AA:BB:CC:DD:EE:FF")
+    scanner = make_scanner(FakeAdapter(peripheral))
+
+    devices = scanner.scan(duration_ms=2000, filter_iot=True, expected_iot_count=1)
+
+    assert [device.address for device in devices] == ["AA:BB:CC:DD:EE:FF"]
+    assert devices[0].has_iot_service()
+    assert scanner.get_peripheral("AA:BB:CC:DD:EE:FF") is peripheral